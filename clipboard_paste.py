@@ -0,0 +1,40 @@
+"""
+Clipboard Paste
+===============
+Entrega texto ao app em foco com um Ctrl+V (em vez de 30ms por tecla do
+pyautogui.write), devolvendo depois o que o usuario tinha no clipboard.
+"""
+
+import time
+
+try:
+    import pyperclip
+except Exception:
+    pyperclip = None
+
+# O app le o clipboard de forma assincrona: espera antes de restaurar/seguir
+_SETTLE_SECONDS = 0.2
+
+
+def paste_text(text: str) -> None:
+    """Cola `text` e restaura o clipboard; sem clipboard utilizavel, digita tecla a tecla."""
+    import pyautogui
+
+    if pyperclip:
+        try:
+            previous = pyperclip.paste()
+            pyperclip.copy(text)
+        except Exception:
+            pass  # sem clipboard utilizavel: cai no write abaixo
+        else:
+            try:
+                pyautogui.hotkey("ctrl", "v")
+                time.sleep(_SETTLE_SECONDS)
+            finally:
+                try:
+                    pyperclip.copy(previous or "")
+                except Exception:
+                    pass
+            return
+    pyautogui.write(text, interval=0.03)
+    time.sleep(_SETTLE_SECONDS)
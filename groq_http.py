@@ -0,0 +1,38 @@
+"""
+Shared Groq Client
+==================
+Um unico cliente Groq (e um unico pool httpx) para STT, visao, STS e LLM:
+as chamadas reaproveitam a mesma conexao TCP+TLS em vez de cada modulo
+abrir a sua. Com o pacote h2 instalado a conexao e HTTP/2 (multiplexada).
+"""
+
+import threading
+from typing import Optional
+
+import httpx
+from groq import Groq
+
+try:
+    import h2  # noqa: F401  (so habilita o HTTP/2 do httpx)
+except Exception:
+    h2 = None
+
+_client: Optional[Groq] = None
+_client_lock = threading.Lock()
+
+
+def get_groq_client(api_key: Optional[str]) -> Optional[Groq]:
+    """Groq compartilhado do processo (None sem chave). A primeira chave define o cliente."""
+    global _client
+    if not api_key:
+        return None
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                http_client = httpx.Client(
+                    http2=h2 is not None,
+                    limits=httpx.Limits(max_connections=8, max_keepalive_connections=8),
+                    timeout=httpx.Timeout(60.0, connect=5.0),
+                )
+                _client = Groq(api_key=api_key, http_client=http_client)
+    return _client
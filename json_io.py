@@ -0,0 +1,41 @@
+"""
+JSON I/O
+========
+Serializacao e gravacao atomica compartilhadas pelos arquivos de memoria,
+contexto de projeto e caches: orjson (C) quando instalado, stdlib no resto.
+"""
+
+import json
+import os
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+# JSON compacto por padrao; CRONO_MEMORY_PRETTY_JSON=1 volta ao indentado (debug)
+PRETTY_JSON = (os.getenv("CRONO_MEMORY_PRETTY_JSON") or "false").lower() in {"1", "true", "yes", "on"}
+
+
+def json_dumps(data: Any, pretty: Optional[bool] = None, default: Optional[Callable] = None) -> bytes:
+    """JSON em UTF-8; pretty=None segue PRETTY_JSON. default so e chamado para tipos desconhecidos."""
+    if pretty is None:
+        pretty = PRETTY_JSON
+    # A stdlib cobre o que o orjson recusa (chaves nao-str, inteiros > 64 bits)
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=default, option=orjson.OPT_INDENT_2 if pretty else 0)
+        except Exception:
+            pass
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False, default=default).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=default).encode("utf-8")
+
+
+def write_atomic(path: str, payload: bytes) -> None:
+    """Grava num .tmp e troca com os.replace: o arquivo nunca fica pela metade."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
@@ -4,12 +4,20 @@ import os
 import json
 import re
 import uuid
+import logging
 import requests
 from datetime import datetime
-from dataclasses import asdict
+from types import MappingProxyType
 from dotenv import load_dotenv
-from groq import Groq
-from core.plan_schema import normalize_plan
+from groq_http import get_groq_client
+from core.plan_schema import normalize_plan, plan_to_dict
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+logger = logging.getLogger("crono.llm")
 
 # Paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -39,6 +47,9 @@ LLM_TOOL_CHOICE = "auto"
 
 _LLM_CACHE_ID = None
 _LLM_CACHE_FINGERPRINT = None
+# Estado do hash ja alimentado com (modelo, system prompt), reusado via copy()
+_FP_BASE_KEY = None
+_FP_BASE = None
 
 def get_default_prompt() -> str:
     """Prompt padro embutido caso o arquivo no exista"""
@@ -159,17 +170,35 @@ def init_cerebro_runtime() -> None:
     LLM_USE_TOOLS = (os.getenv("GROQ_USE_TOOLS") or "true").lower() in {"1", "true", "yes", "on"}
     LLM_TOOL_CHOICE = os.getenv("GROQ_TOOL_CHOICE") or "auto"
     api_key = os.getenv("GROQ_API_KEY") or ""
-    LLM_CLIENT_GROQ = Groq(api_key=api_key) if api_key else None
+    LLM_CLIENT_GROQ = get_groq_client(api_key)
     LLM_CLIENT = True if LLM_OPENROUTER_KEY or LLM_CLIENT_GROQ else None
     LLM_INITIALIZED = True
 
 
+def _json_loads(text: str):
+    # orjson (parser em C) quando instalado; a stdlib cobre o que ele recusa
+    # (NaN, inteiros > 64 bits) e o caso sem a dependencia.
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except Exception:
+            pass
+    return json.loads(text)
+
+
 def safe_json_parse(text: str) -> dict | None:
     """Parse JSON da resposta do LLM, removendo markdown se necessrio"""
     if not text:
         return None
     text = text.strip()
 
+    # Caminho comum (json mode): a resposta ja e um objeto JSON puro
+    if text.startswith("{") and text.endswith("}"):
+        try:
+            return _json_loads(text)
+        except Exception:
+            pass
+
     # Remover blocos de cdigo markdown
     if "```json" in text:
         try:
@@ -189,7 +218,7 @@ def safe_json_parse(text: str) -> dict | None:
         start = text.index("{")
         end = text.rindex("}") + 1
         json_str = text[start:end]
-        return json.loads(json_str)
+        return _json_loads(json_str)
     except Exception as e:
         print(f" JSON parse error: {e}")
         return None
@@ -221,7 +250,30 @@ def _build_envelope(
         "plan": plan or [],
         "response": response,
     }
-    return asdict(normalize_plan(raw))
+    return plan_to_dict(normalize_plan(raw))
+
+
+# Envelopes fixos (clarificacao/erro) montados uma vez; _canned_envelope faz
+# uma copia rasa com plan_id novo em vez de refazer normalize_plan a cada uso.
+_CLARIFY_APP_NAME_ENVELOPE = MappingProxyType(_build_envelope(
+    needs_clarification=True,
+    clarifying_question="Qual o nome exato do aplicativo",
+))
+_NOT_UNDERSTOOD_ENVELOPE = MappingProxyType(_build_envelope(response="Desculpe, nao entendi.", goal="Conversa"))
+_LLM_UNAVAILABLE_ENVELOPE = MappingProxyType(_build_envelope(
+    response="IA principal indisponivel. Posso executar acoes diretas se voce pedir.",
+    goal="Conversa",
+))
+_RETRY_ENVELOPE = MappingProxyType(_build_envelope(response="Desculpe, tive um problema. Tenta de novo", goal="Conversa"))
+
+
+def _canned_envelope(template: MappingProxyType, goal: str | None = None) -> dict:
+    env = dict(template)
+    env["plan_id"] = str(uuid.uuid4())
+    env["plan"] = []
+    if goal is not None:
+        env["goal"] = str(goal).strip()
+    return env
 
 
 def _normalize_time_12h(text: str) -> str:
@@ -283,6 +335,74 @@ def _strip_accents(text: str) -> str:
     )
 
 
+def _normalize_key(user_text: str) -> str:
+    # Chave normalizada (minusculas, sem acentos) calculada uma vez por turno
+    # e compartilhada entre os fast-paths locais.
+    if not user_text:
+        return ""
+    return _strip_accents(user_text.strip().lower())
+
+
+# Marcadores dos fast-paths locais (substrings sobre a chave normalizada).
+# Tuplas de modulo: nenhuma lista e alocada a cada chamada.
+_LAST_SCREEN_MARKERS = ("ultima tela", "ultima imagem da tela", "tela anterior", "ultima visao")
+_LAST_IMAGE_MARKERS = ("ultima imagem", "imagem mais recente", "imagem recente")
+_LAST_SITE_MARKERS = ("ultimo site", "ultimo website", "ultima pagina", "ultimo link")
+
+_TIMER_MARKERS = ("temporizador", "timer", "cronometro", "alarme", "me avisa", "me lembre")
+_TIMER_NOUN_MARKERS = ("timer", "temporizador", "alarme", "alarmes", "cronometro")
+_TIMER_STATUS_MARKERS = ("qual", "quais", "quanto falta", "falt", "resta", "ativo", "ativos", "tem", "existem")
+_TIMER_CANCEL_MARKERS = ("apague", "cancele", "cancelar", "parar", "pare", "remova", "desative")
+_TIMER_MINUTE_MARKERS = ("min", "minuto", "minutos", "temporizador", "timer")
+_PM_MARKERS = ("pm", "p.m", "da tarde", "da noite")
+_AM_MARKERS = ("am", "a.m", "da manha")
+
+_WEATHER_TIME_MARKERS = ("chuva", "chover", "vai chover", "clima", "temperatura", "previsao")
+_UNTIL_MARKERS = ("quanto tempo", "quanto falta", "falta quanto", "ate", "para")
+_HOW_LONG_MARKERS = ("quanto tempo", "quanto falta", "falta quanto", "falta para", "falta pra")
+_PERIOD_MARKERS = ("da tarde", "de tarde", "da noite", "da manha", "de manha", "madrugada")
+
+# Substrings: "analisa" ja cobre "analisar", entao a forma longa nao entra.
+_REASONING_MARKERS = (
+    "por que", "porque", "explique", "explicar", "passo a passo", "raciocinio",
+    "logica", "planejar", "planejamento", "como voce chegou", "como chegou",
+    "memoria", "lembra", "ultima tela", "ultima imagem", "ultimo site",
+    "calcule", "calcular", "resolver", "analise", "analisa",
+    "programacao", "codigo",
+)
+
+_WEB_SEARCH_MARKERS = (
+    "pesquise", "pesquisar", "procure", "procurar", "busque", "buscar",
+    "na internet", "na web", "pesquisa na web", "pesquisa na internet",
+    "pesquise na web", "pesquise na internet", "procure na web", "procure na internet",
+)
+_LIVE_MARKERS = ("agora", "hoje", "neste momento", "nesse momento", "atual")
+_PRICE_MARKERS = ("preco", "cotacao", "quanto esta", "valor do", "taxa de cambio")
+
+_WEATHER_MARKERS = (
+    "clima", "tempo", "previsao", "chuva", "chover", "temperatura",
+    "graus", "frio", "quente",
+)
+
+_PLAYLIST_OPEN_MARKERS = ("abrir", "abre", "abra", "tocar", "toca", "play")
+_PLAYLIST_STOP_MARKERS = ("pra mim", "para mim", "agora", "por favor")
+
+# Condicoes necessarias de entrada dos fast-paths (timer, hora, web, clima,
+# playlist) num unico regex: conversa comum pula a cascata com uma so varredura.
+_FAST_PATH_TRIGGERS = (
+    *_TIMER_MARKERS,
+    "que horas", "meio dia", "meio-dia", "12:00", "meia noite", "meia-noite", "0:00",
+    *_HOW_LONG_MARKERS,
+    *_WEB_SEARCH_MARKERS,
+    *_PRICE_MARKERS,
+    *_WEATHER_MARKERS,
+    "playlist", "lista de reproducao",
+)
+_FAST_PATH_TRIGGER_RE = re.compile(
+    r"^hora|" + "|".join(re.escape(k) for k in sorted(set(_FAST_PATH_TRIGGERS), key=len, reverse=True))
+)
+
+
 def _format_memory_context(memory_block: dict | None) -> str:
     if not memory_block:
         return ""
@@ -292,16 +412,17 @@ def _format_memory_context(memory_block: dict | None) -> str:
         return str(memory_block)
 
 
-def _maybe_answer_from_memory(user_text: str, memory_block: dict | None) -> dict | None:
+def _maybe_answer_from_memory(user_text: str, memory_block: dict | None, t: str | None = None) -> dict | None:
     if not user_text or not memory_block:
         return None
-    t = _strip_accents(user_text.lower())
+    if t is None:
+        t = _normalize_key(user_text)
 
     last_screen = memory_block.get("last_screen_description") or memory_block.get("recent_screen_analysis")
     last_image = memory_block.get("last_image_description")
     last_site = memory_block.get("last_opened_website")
 
-    if any(k in t for k in ["ultima tela", "ultima imagem da tela", "tela anterior", "ultima visao"]):
+    if any(k in t for k in _LAST_SCREEN_MARKERS):
         if last_screen:
             return _build_envelope(
                 response=f"A ultima tela registrada foi: {last_screen}",
@@ -312,7 +433,7 @@ def _maybe_answer_from_memory(user_text: str, memory_block: dict | None) -> dict
             goal="Responder sobre ultima tela"
         )
 
-    if any(k in t for k in ["ultima imagem", "imagem mais recente", "imagem recente"]):
+    if any(k in t for k in _LAST_IMAGE_MARKERS):
         if last_image:
             return _build_envelope(
                 response=f"A ultima imagem registrada foi: {last_image}",
@@ -323,7 +444,7 @@ def _maybe_answer_from_memory(user_text: str, memory_block: dict | None) -> dict
             goal="Responder sobre ultima imagem"
         )
 
-    if any(k in t for k in ["ultimo site", "ultimo website", "ultima pagina", "ultimo link"]):
+    if any(k in t for k in _LAST_SITE_MARKERS):
         if last_site:
             return _build_envelope(
                 response=f"O ultimo site aberto foi: {last_site}",
@@ -353,9 +474,17 @@ def _maybe_answer_from_memory(user_text: str, memory_block: dict | None) -> dict
 
 
 def _cache_fingerprint(model: str, system_prompt: str, memory_context: str) -> str:
+    global _FP_BASE_KEY, _FP_BASE
     import hashlib
-    base = f"{model}||{system_prompt}||{memory_context}"
-    return hashlib.sha256(base.encode("utf-8", errors="ignore")).hexdigest()
+    # Modelo e system prompt quase nunca mudam: so o memory_context e hasheado por turno.
+    key = (model, system_prompt)
+    if _FP_BASE is None or _FP_BASE_KEY != key:
+        base = hashlib.blake2b(digest_size=16)
+        base.update(f"{model}||{system_prompt}||".encode("utf-8", errors="ignore"))
+        _FP_BASE_KEY, _FP_BASE = key, base
+    h = _FP_BASE.copy()
+    h.update(memory_context.encode("utf-8", errors="ignore"))
+    return h.hexdigest()
 
 
 def _extract_cache_id(resp) -> str | None:
@@ -442,6 +571,16 @@ def _structured_schema_prompt() -> str:
     )
 
 
+# Mensagens de sistema fixas: montadas uma vez e reusadas em todo turno
+# (ninguem muta os dicts de `messages`, so filtra/concatena listas).
+_STRUCTURED_SCHEMA_MESSAGE = {"role": "system", "content": _structured_schema_prompt()}
+_REASONING_HINT_MESSAGE = {
+    "role": "system",
+    "content": "Use reasoning to explain your plan before responding when helpful.",
+}
+_PLAIN_TEXT_MESSAGE = {"role": "system", "content": "Responda diretamente em texto simples, sem JSON."}
+
+
 def _validate_structured_output(obj: dict | None) -> tuple[bool, str]:
     if not isinstance(obj, dict):
         return False, "not a dict"
@@ -609,7 +748,7 @@ def _tool_calls_to_envelope(tool_calls: list, user_text: str) -> dict | None:
             args = fn.get("arguments") or {}
             if isinstance(args, str):
                 try:
-                    args = json.loads(args)
+                    args = _json_loads(args)
                 except Exception:
                     args = {}
             step = _build_step(name, args, summary=f"Executar {name}")
@@ -700,7 +839,16 @@ def _format_duration_pt_br(total_seconds: int) -> str:
     return " e ".join(parts)
 
 
-def _maybe_handle_time_question(user_text: str) -> dict | None:
+def _to_24h(hh: int, is_am: bool, is_pm: bool) -> int:
+    # Ajusta a hora falada (12h) para 24h conforme o periodo detectado.
+    if is_pm and hh < 12:
+        hh += 12
+    if is_am and hh == 12:
+        hh = 0
+    return hh
+
+
+def _maybe_handle_time_question(user_text: str, t: str | None = None) -> dict | None:
     """
     Fast local answers for time questions.
 
@@ -709,14 +857,15 @@ def _maybe_handle_time_question(user_text: str) -> dict | None:
     if not user_text or not user_text.strip():
         return None
 
-    t = _strip_accents(user_text.lower()).strip()
+    if t is None:
+        t = _normalize_key(user_text)
 
     # If this is a timer/alarm request, let timer parser handle it.
-    if any(k in t for k in ["temporizador", "timer", "cronometro", "alarme", "me avisa", "me lembre"]):
+    if any(k in t for k in _TIMER_MARKERS):
         return None
 
     # Avoid answering "time now" for weather questions
-    if any(k in t for k in ["chuva", "chover", "vai chover", "clima", "temperatura", "previsao"]):
+    if any(k in t for k in _WEATHER_TIME_MARKERS):
         return None
 
     # Current time
@@ -731,9 +880,7 @@ def _maybe_handle_time_question(user_text: str) -> dict | None:
         return _build_envelope(response=f"Sao {now_12h}, senhor.", goal="Informar horario atual")
 
     # Time until noon
-    if ("meio dia" in t or "meio-dia" in t or "12:00" in t) and any(
-        k in t for k in ["quanto tempo", "quanto falta", "falta quanto", "ate", "para"]
-    ):
+    if ("meio dia" in t or "meio-dia" in t or "12:00" in t) and any(k in t for k in _UNTIL_MARKERS):
         from datetime import datetime, timedelta
         now = datetime.now()
         noon = now.replace(hour=12, minute=0, second=0, microsecond=0)
@@ -749,7 +896,7 @@ def _maybe_handle_time_question(user_text: str) -> dict | None:
 
     # Time until midnight
     if ("meia noite" in t or "meia-noite" in t or "00:00" in t or "0:00" in t) and any(
-        k in t for k in ["quanto tempo", "quanto falta", "falta quanto", "ate", "para"]
+        k in t for k in _UNTIL_MARKERS
     ):
         from datetime import datetime, timedelta
         now = datetime.now()
@@ -763,7 +910,7 @@ def _maybe_handle_time_question(user_text: str) -> dict | None:
         )
 
     # Generic "how long until HH:MM / N horas" (ex: "quanto tempo falta para duas horas?")
-    if any(k in t for k in ["quanto tempo", "quanto falta", "falta quanto", "falta para", "falta pra"]):
+    if any(k in t for k in _HOW_LONG_MARKERS):
         import re
         from datetime import datetime, timedelta
 
@@ -797,14 +944,15 @@ def _maybe_handle_time_question(user_text: str) -> dict | None:
             now = datetime.now()
 
             # Period disambiguation
-            if ("da tarde" in t or "de tarde" in t or "da noite" in t) and target_hour < 12:
-                target_hour += 12
-            if ("da manha" in t or "de manha" in t or "madrugada" in t) and target_hour == 12:
-                target_hour = 0
+            target_hour = _to_24h(
+                target_hour,
+                is_am="da manha" in t or "de manha" in t or "madrugada" in t,
+                is_pm="da tarde" in t or "de tarde" in t or "da noite" in t,
+            )
 
             candidates = []
             # If no explicit period and hour is 1..12, consider both AM and PM; choose nearest future.
-            explicit_period = any(p in t for p in ["da tarde", "de tarde", "da noite", "da manha", "de manha", "madrugada"])
+            explicit_period = any(p in t for p in _PERIOD_MARKERS)
             if not explicit_period and 1 <= target_hour <= 12:
                 candidates = [target_hour, (target_hour + 12) % 24]
             else:
@@ -833,45 +981,38 @@ def _maybe_handle_time_question(user_text: str) -> dict | None:
     return None
 
 
-def _maybe_handle_timer_request(user_text: str) -> dict | None:
+def _maybe_handle_timer_request(user_text: str, t: str | None = None) -> dict | None:
     """
     Local fast-path for simple timer requests.
     """
     if not user_text or not user_text.strip():
         return None
 
-    raw = user_text.strip()
-    t = _strip_accents(raw.lower())
+    if t is None:
+        t = _normalize_key(user_text)
 
-    timer_markers = ["temporizador", "timer", "cronometro", "alarme", "me avisa", "me lembre"]
-    if not any(k in t for k in timer_markers):
+    if not any(k in t for k in _TIMER_MARKERS):
         return None
 
     # Status query should be handled by session memory (orchestrator), not by creating timer.
-    if any(k in t for k in ["qual", "quais", "quanto falta", "falt", "resta", "ativo", "ativos", "tem", "existem"]) and any(
-        k in t for k in ["timer", "temporizador", "alarme", "alarmes", "cronometro"]
-    ):
+    if any(k in t for k in _TIMER_STATUS_MARKERS) and any(k in t for k in _TIMER_NOUN_MARKERS):
         return None
 
     import re
 
     # If user wants to cancel/stop a timer, hand off to LLM (no fast-path).
-    if any(k in t for k in ["apague", "cancele", "cancelar", "parar", "pare", "remova", "desative"]):
+    if any(k in t for k in _TIMER_CANCEL_MARKERS):
         return None
 
     # Timer by clock time (e.g. 8:30 / 8h30 / 8 e meia / 8h30pm).
-    is_pm = any(k in t for k in ["pm", "p.m", "da tarde", "da noite"])
-    is_am = any(k in t for k in ["am", "a.m", "da manha"])
+    is_pm = any(k in t for k in _PM_MARKERS)
+    is_am = any(k in t for k in _AM_MARKERS)
 
     m_clock = re.search(r"\b(\d{1,2})\s*[:h]\s*(\d{2})\b", t)
     if m_clock:
         try:
-            hh = int(m_clock.group(1))
+            hh = _to_24h(int(m_clock.group(1)), is_am, is_pm)
             mm = int(m_clock.group(2))
-            if is_pm and hh < 12:
-                hh += 12
-            if is_am and hh == 12:
-                hh = 0
             if 0 <= hh <= 23 and 0 <= mm <= 59:
                 return _build_envelope(
                     needs_clarification=False,
@@ -884,11 +1025,7 @@ def _maybe_handle_timer_request(user_text: str) -> dict | None:
     m_half = re.search(r"\b(\d{1,2})\s*e\s*meia\b", t)
     if m_half:
         try:
-            hh = int(m_half.group(1))
-            if is_pm and hh < 12:
-                hh += 12
-            if is_am and hh == 12:
-                hh = 0
+            hh = _to_24h(int(m_half.group(1)), is_am, is_pm)
             if 0 <= hh <= 23:
                 return _build_envelope(
                     needs_clarification=False,
@@ -957,7 +1094,7 @@ def _maybe_handle_timer_request(user_text: str) -> dict | None:
     # If the user gave just a number, assume minutes.
     if total <= 0:
         m = re.search(r"\b(\d+)\b", t)
-        if m and any(k in t for k in ["min", "minuto", "minutos", "temporizador", "timer"]):
+        if m and any(k in t for k in _TIMER_MINUTE_MARKERS):
             try:
                 total = int(m.group(1)) * 60
             except Exception:
@@ -991,7 +1128,7 @@ def _normalize_llm_response(parsed: dict | None, user_text: str) -> dict | None:
 
     # New plan schema already
     if "plan" in parsed or "plan_id" in parsed:
-        return asdict(normalize_plan(parsed))
+        return plan_to_dict(normalize_plan(parsed))
 
     # Legacy actions array
     if "actions" in parsed and isinstance(parsed.get("actions"), list):
@@ -1013,9 +1150,10 @@ def _normalize_llm_response(parsed: dict | None, user_text: str) -> dict | None:
             response = parsed.get("text") or parsed.get("content") or parsed.get("response")
             return _build_envelope(response=response, goal="Conversa")
         step = _build_step(intent, params, parsed.get("summary"))
-        response = parsed.get("text") if parsed.get("text") else None
+        text = parsed.get("text")
+        response = text if text else None
         needs_clarification = bool(parsed.get("needs_clarification", False))
-        clarifying_question = parsed.get("clarifying_question") or (parsed.get("text") if needs_clarification else None)
+        clarifying_question = parsed.get("clarifying_question") or (text if needs_clarification else None)
         return _build_envelope(
             plan=[step] if not needs_clarification else [],
             response=response if not needs_clarification else None,
@@ -1032,43 +1170,31 @@ def _normalize_llm_response(parsed: dict | None, user_text: str) -> dict | None:
     return None
 
 
-def _needs_reasoning_hint(user_text: str) -> bool:
+def _needs_reasoning_hint(user_text: str, t: str | None = None) -> bool:
     if not user_text:
         return False
-    t = _strip_accents(user_text.lower())
-    keywords = [
-        "por que", "porque", "explique", "explicar", "passo a passo", "raciocinio",
-        "logica", "planejar", "planejamento", "como voce chegou", "como chegou",
-        "memoria", "lembra", "ultima tela", "ultima imagem", "ultimo site",
-        "calcule", "calcular", "resolver", "analise", "analisa", "analisar",
-        "programacao", "codigo"
-    ]
-    return any(k in t for k in keywords)
+    if t is None:
+        t = _normalize_key(user_text)
+    return any(k in t for k in _REASONING_MARKERS)
 
 
-def _is_web_search_request(user_text: str) -> bool:
+def _is_web_search_request(user_text: str, t: str | None = None) -> bool:
     if not user_text or not user_text.strip():
         return False
-    t = _strip_accents(user_text.lower())
-    explicit = [
-        "pesquise", "pesquisar", "procure", "procurar", "busque", "buscar",
-        "na internet", "na web", "pesquisa na web", "pesquisa na internet",
-        "pesquise na web", "pesquise na internet", "procure na web", "procure na internet"
-    ]
-    if any(k in t for k in explicit):
+    if t is None:
+        t = _normalize_key(user_text)
+    if any(k in t for k in _WEB_SEARCH_MARKERS):
         return True
 
     # Heuristica para perguntas tipicamente "agora/hoje"
-    live_markers = ["agora", "hoje", "neste momento", "nesse momento", "atual"]
-    price_markers = ["preco", "cotacao", "quanto esta", "valor do", "taxa de cambio"]
-    if any(k in t for k in live_markers) and any(k in t for k in price_markers):
+    if any(k in t for k in _LIVE_MARKERS) and any(k in t for k in _PRICE_MARKERS):
         return True
 
     return False
 
 
-def _maybe_handle_web_search_request(user_text: str) -> dict | None:
-    if not _is_web_search_request(user_text):
+def _maybe_handle_web_search_request(user_text: str, t: str | None = None) -> dict | None:
+    if not _is_web_search_request(user_text, t):
         return None
 
     query = re.sub(
@@ -1086,17 +1212,14 @@ def _maybe_handle_web_search_request(user_text: str) -> dict | None:
     return _build_envelope(plan=[step], goal=f"Pesquisar: {query}")
 
 
-def _maybe_handle_weather_request(user_text: str) -> dict | None:
+def _maybe_handle_weather_request(user_text: str, t: str | None = None) -> dict | None:
     if not user_text or not user_text.strip():
         return None
     raw = user_text.strip()
-    t = _strip_accents(raw.lower())
+    if t is None:
+        t = _normalize_key(user_text)
 
-    weather_markers = [
-        "clima", "tempo", "previsao", "chuva", "chover", "temperatura",
-        "graus", "frio", "quente"
-    ]
-    if not any(k in t for k in weather_markers):
+    if not any(k in t for k in _WEATHER_MARKERS):
         return None
 
     # Avoid conflicting with explicit time-of-day questions
@@ -1120,7 +1243,7 @@ def _maybe_handle_weather_request(user_text: str) -> dict | None:
             "belo horizonte": "Belo Horizonte",
         }
         for k, v in city_map.items():
-            if k in _strip_accents(raw.lower()):
+            if k in t:
                 city = v
                 break
 
@@ -1131,23 +1254,25 @@ def _maybe_handle_weather_request(user_text: str) -> dict | None:
     return _build_envelope(plan=[step], goal=f"Clima em {city}")
 
 
-def _maybe_handle_playlist_request(user_text: str) -> dict | None:
+def _maybe_handle_playlist_request(user_text: str, t: str | None = None) -> dict | None:
     if not user_text or not user_text.strip():
         return None
-    raw = user_text.strip()
-    t = _strip_accents(raw.lower())
+    if t is None:
+        t = _normalize_key(user_text)
     if "playlist" not in t and "lista de reproducao" not in t:
         return None
 
     # Open/play intent
-    if any(k in t for k in ["abrir", "abre", "abra", "tocar", "toca", "play"]):
+    if any(k in t for k in _PLAYLIST_OPEN_MARKERS):
         name = ""
         marker = "playlist" if "playlist" in t else "lista de reproducao"
-        tail = t.split(marker, 1)[1].strip() if marker in t else ""
+        idx = t.find(marker)
+        tail = t[idx + len(marker):].strip() if idx >= 0 else ""
         tail = re.sub(r"^(do|da|de|dos|das)\s+", "", tail).strip()
-        for stop in ["pra mim", "para mim", "agora", "por favor"]:
-            if stop in tail:
-                tail = tail.split(stop, 1)[0].strip()
+        for stop in _PLAYLIST_STOP_MARKERS:
+            idx = tail.find(stop)
+            if idx >= 0:
+                tail = tail[:idx].strip()
         if tail and tail not in {"aquela", "essa", "esta"}:
             name = tail
         if not name:
@@ -1162,6 +1287,262 @@ def _maybe_handle_playlist_request(user_text: str) -> dict | None:
     return None
 
 
+# Mapeamento de keywords -> intent (ordem importa!). Construido uma vez no import.
+_INTENT_PATTERNS: tuple[tuple[str, tuple[str, ...]], ...] = (
+    # Viso e tela (PRIORIDADE MXIMA)
+    ("describe_screen", (
+        "o que voc v", "o que v", "que voc v", "v na tela",
+        "descreve a tela", "descreva a tela", "descrever a tela",
+        "o que tem na tela", "que tem na tela", "o que est na tela",
+        "analisa a tela", "analise a tela", "analisar a tela",
+        "veja a tela", "veja isso", "olha a tela", "olhe a tela",
+        "me diz o que", "me diga o que", "pode ver",
+    )),
+
+    # Abrir apps
+    ("open_app", (
+        "abra o", "abre o", "abrir o", "abre", "abra", "open",
+        "iniciar", "inicia o", "inicia", "roda o", "rode o", "execute o",
+        "liga o", "ligue o",
+    )),
+
+    # Fechar apps
+    ("close_app", (
+        "fecha o", "feche o", "fechar o", "fecha", "feche", "close",
+        "encerra o", "encerrar o", "encerra", "mata o", "mate o",
+        "desliga o", "desligue o",
+    )),
+
+    # Websites
+    ("open_website", (
+        "youtube.com", "google.com", "facebook.com", "instagram.com",
+        "twitter.com", "github.com", "abra o site", "abre o site",
+        "vai para o site", "acessa o site", "acesse",
+    )),
+    ("search_web", (
+        "pesquise", "pesquisar", "procure", "procurar", "busque", "buscar",
+        "na internet", "na web", "pesquisa na internet", "pesquisa na web",
+    )),
+    ("fetch_web_content", (
+        "resuma esse link", "resume esse link", "resuma esta pagina", "resuma essa pagina",
+        "analise esta url", "analise essa url", "leia esta url", "leia esse link",
+    )),
+
+    # Comandos do sistema (PowerShell)
+    ("system_command", (
+        "executa o comando", "execute o comando", "rodar comando", "rode o comando",
+        "no powershell", "powershell:",
+    )),
+
+    # Temporizador
+    ("set_timer", (
+        "temporizador", "timer", "cronometro", "cronmetro", "me avisa em", "me lembre em",
+    )),
+
+    # Calendrio
+    ("schedule_calendar", (
+        "agenda", "agendar", "calendario", "calendrio", "marcar no calendario", "marcar no calendrio", "compromisso",
+    )),
+
+    # Status do sistema (CPU/RAM/Disco)
+    ("system_status", (
+        "uso de cpu", "uso da cpu", "cpu", "processador",
+        "uso de ram", "uso da ram", "memoria ram", "memria ram", "ram",
+        "uso do disco", "disco cheio", "armazenamento",
+        "status do sistema", "desempenho do sistema", "monitoramento",
+    )),
+
+    # Controle de tela (clique, movimento)
+    ("control_screen", (
+        "clica aqui", "clique aqui", "click here",
+        "mova o mouse", "moves o mouse", "arrasta", "arraste",
+    )),
+
+    # Navegao visual (clica em boto especfico)
+    ("visual_navigate", (
+        "clica no", "clique no", "clica em", "clique em",
+        "aperta o", "aperte o", "pressiona o", "pressione o",
+    )),
+
+    # Digitar texto
+    ("type_text", (
+        "digite", "digita", "escreva", "escreve", "type",
+    )),
+
+    # Clima (apenas quando for sobre clima mesmo, no tempo genrico)
+    ("weather_report", (
+        "qual o clima", "como est o clima", "previso do tempo",
+        "vai chover", "temperatura", "graus", "est frio", "est quente",
+        "tempo em", "clima em", "weather in", "tempo hoje", "clima hoje",
+    )),
+
+    # Arquivos
+    ("file_operation", (
+        "cria arquivo", "criar arquivo", "delete arquivo", "apaga arquivo",
+        "cria pasta", "criar pasta", "delete pasta", "apaga pasta",
+        "lista arquivo", "listar arquivo", "l arquivo", "ler arquivo",
+    )),
+
+    # Projetos
+    ("project_manager", (
+        "comea projeto", "comear projeto", "inicia projeto", "iniciar projeto",
+        "novo projeto", "criar projeto", "encerra projeto", "sair projeto",
+    )),
+
+    # Msica/Media
+    ("play_media", (
+        "toca", "tocar", "play", "msica", "musica", "som",
+    )),
+    ("remember_note", (
+        "lembra de", "lembre de", "memoriza", "memorizar", "guarda isso",
+        "guarde isso", "salva isso", "salvar isso", "anota", "anote",
+    )),
+    ("search_personal_data", (
+        "o que voce lembra", "o que você lembra", "o que sabe sobre",
+        "me lembra sobre", "buscar na memoria", "buscar na memória",
+        "procura nas minhas notas", "procure nas minhas notas",
+    )),
+    ("clear_popups", (
+        "limpa popup", "limpar popups", "fechar popups", "sumir popups",
+        "limpa alertas", "limpar alertas", "fechar alertas",
+    )),
+)
+
+
+
+class _KeywordAutomaton:
+    """
+    Automato Aho-Corasick (trie + links de falha) sobre as keywords de intent.
+    Uma unica passada no texto reporta todas as keywords presentes.
+    Depois do build() cada no guarda as transicoes ja resolvidas (DFA), entao
+    a varredura faz um unico dict.get por caractere, sem seguir links de falha.
+    """
+
+    __slots__ = ("_goto", "_fail", "_out")
+
+    def __init__(self) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple] = [()]
+
+    def add(self, keyword: str, payload: tuple) -> None:
+        node = 0
+        for ch in keyword:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = nxt
+        self._out[node] += (payload,)
+
+    def build(self) -> None:
+        from collections import deque
+        goto, fail, out = self._goto, self._fail, self._out
+        order = []
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for ch, nxt in goto[node].items():
+                queue.append(nxt)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] += out[fail[nxt]]
+        # Em ordem BFS o no de falha ja esta resolvido quando chegamos no filho.
+        for node in order:
+            goto[node] = {**goto[fail[node]], **goto[node]}
+
+    def best_match(self, text: str) -> tuple | None:
+        """Payload de menor prioridade (rank) cuja keyword casa no texto."""
+        goto, out = self._goto, self._out
+        size = len(text)
+        best = None
+        node = 0
+        for end, ch in enumerate(text):
+            node = goto[node].get(ch, 0)
+            hits = out[node]
+            if not hits:
+                continue
+            for payload in hits:
+                keyword, rank, _intent, bounded = payload
+                if best is not None and rank >= best[1]:
+                    continue
+                if bounded:
+                    start = end - len(keyword) + 1
+                    if start > 0 and _is_word_char(text[start - 1]):
+                        continue
+                    if end + 1 < size and _is_word_char(text[end + 1]):
+                        continue
+                best = payload
+                if rank == 0:
+                    return best
+        return best
+
+
+def _is_word_char(ch: str) -> bool:
+    # Mesmo criterio do \w do modulo re para str.
+    return ch.isalnum() or ch == "_"
+
+
+def _build_keyword_automaton() -> _KeywordAutomaton:
+    # Payload: (keyword, prioridade, intent, exige_borda_de_palavra).
+    # Keywords so de palavras exigem borda de palavra; as demais
+    # (ex: "youtube.com", "powershell:") casam como substring.
+    automaton = _KeywordAutomaton()
+    seen = set()
+    for rank, (intent, keywords) in enumerate(_INTENT_PATTERNS):
+        for keyword in keywords:
+            kw = " ".join(_strip_accents(keyword.lower()).split())
+            if not kw or kw in seen:
+                continue
+            seen.add(kw)
+            bounded = re.fullmatch(r"[\w\s]+", kw) is not None
+            automaton.add(kw, (kw, rank, intent, bounded))
+    automaton.build()
+    return automaton
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+
+def _scan_keyword_intent(text: str) -> tuple[str, str] | None:
+    """Retorna (intent, keyword) de maior prioridade presente no texto, ou None."""
+    # Espacos colapsados: keywords com varias palavras casam com qualquer whitespace.
+    best = _KEYWORD_AUTOMATON.best_match(" ".join(text.split()))
+    if best is None:
+        return None
+    keyword, _rank, intent, _bounded = best
+    return intent, keyword
+
+
+# Dominio "solto" numa frase (www.exemplo.com, exemplo.com.br/pagina), ancorado
+# no inicio de uma palavra. Uma unica varredura em C no lugar do split por palavra.
+_RE_URLISH = re.compile(
+    r"(?<!\S)((?:https?://)?(?:www\.\S+|[\w\-.]+\.(?:com\.br|com|org|net|io|dev|ai|gov|edu)(?![\w\-])\S*))",
+    re.IGNORECASE,
+)
+
+# Marcadores de system_command, em ordem de prioridade
+_COMMAND_MARKERS = ("powershell:", "executa o comando", "execute o comando", "rodar comando", "rode o comando")
+
+# Prefixos removidos dos parametros extraidos (uma varredura em C cada)
+_PLAY_PREFIX_RE = re.compile(r"(?:tocar?|play)\s+", re.IGNORECASE)
+_NOTE_PREFIX_RE = re.compile(
+    r"(lembr[ae] de|memorizar?|guard[ae] isso|salvar? isso|anot[ae])\s*(.*)",
+    re.IGNORECASE,
+)
+_MEMORY_QUERY_PREFIX_RE = re.compile(
+    r"(o que voc[eê] lembra|o que sabe sobre|me lembra sobre|buscar na mem[oó]ria"
+    r"|procur[ae] nas minhas notas)\s*(.*)",
+    re.IGNORECASE,
+)
+
+
 def detect_intent_by_keywords(user_text: str) -> tuple[str | None, dict]:
     """
     Sistema de fallback: detecta intent por keywords quando Trinity falha.
@@ -1169,14 +1550,6 @@ def detect_intent_by_keywords(user_text: str) -> tuple[str | None, dict]:
     """
     text_lower = user_text.lower()
 
-    def _keyword_match(keyword: str) -> bool:
-        kw = (keyword or "").strip().lower()
-        if not kw:
-            return False
-        if re.fullmatch(r"[\w\s]+", kw, flags=re.IGNORECASE):
-            pattern = r"(<!\w)" + re.escape(kw).replace(r"\ ", r"\s+") + r"(!\w)"
-            return re.search(pattern, text_lower, flags=re.IGNORECASE) is not None
-        return kw in text_lower
     # Cancelar timer
     if any(k in text_lower for k in ["timer", "temporizador", "cronometro", "cronmetro"]) and any(
         k in text_lower for k in ["apague", "cancele", "cancelar", "pare", "parar", "remova", "desative"]
@@ -1193,12 +1566,14 @@ def detect_intent_by_keywords(user_text: str) -> tuple[str | None, dict]:
             params["action"] = "create"
         name = None
         for marker in ["playlist", "lista de reproducao"]:
-            if marker in text_lower:
-                tail = text_lower.split(marker, 1)[1].strip()
+            idx = text_lower.find(marker)
+            if idx >= 0:
+                tail = text_lower[idx + len(marker):].strip()
                 tail = re.sub(r"^(do|da|de|dos|das)\s+", "", tail)
                 for stop in ["por favor", "pra mim", "para mim", "agora"]:
-                    if stop in tail:
-                        tail = tail.split(stop, 1)[0].strip()
+                    idx = tail.find(stop)
+                    if idx >= 0:
+                        tail = tail[:idx].strip()
                 if tail:
                     name = tail
                     break
@@ -1206,366 +1581,227 @@ def detect_intent_by_keywords(user_text: str) -> tuple[str | None, dict]:
             params["name"] = name
         return ("play_media", params)
 
+    # Uma unica varredura sobre o texto sem acentos (ordem de prioridade preservada)
+    match = _scan_keyword_intent(_strip_accents(text_lower))
+    if match:
+        intent, keyword = match
+        logger.debug("[KEYWORD] detectada: '%s' -> intent=%s", keyword, intent)
 
-    # Mapeamento de keywords -> intent
-    intent_patterns = {
-        # Viso e tela (PRIORIDADE MXIMA)
-        "describe_screen": [
-            "o que voc v", "o que v", "que voc v", "v na tela",
-            "descreve a tela", "descreva a tela", "descrever a tela",
-            "o que tem na tela", "que tem na tela", "o que est na tela",
-            "analisa a tela", "analise a tela", "analisar a tela",
-            "veja a tela", "veja isso", "olha a tela", "olhe a tela",
-            "me diz o que", "me diga o que", "pode ver"
-        ],
-
-        # Abrir apps
-        "open_app": [
-            "abra o", "abre o", "abrir o", "abre", "abra", "open",
-            "iniciar", "inicia o", "inicia", "roda o", "rode o", "execute o",
-            "liga o", "ligue o"
-        ],
-
-        # Fechar apps
-        "close_app": [
-            "fecha o", "feche o", "fechar o", "fecha", "feche", "close",
-            "encerra o", "encerrar o", "encerra", "mata o", "mate o",
-            "desliga o", "desligue o"
-        ],
-
-        # Websites
-        "open_website": [
-            "youtube.com", "google.com", "facebook.com", "instagram.com",
-            "twitter.com", "github.com", "abra o site", "abre o site",
-            "vai para o site", "acessa o site", "acesse"
-        ],
-        "search_web": [
-            "pesquise", "pesquisar", "procure", "procurar", "busque", "buscar",
-            "na internet", "na web", "pesquisa na internet", "pesquisa na web"
-        ],
-        "fetch_web_content": [
-            "resuma esse link", "resume esse link", "resuma esta pagina", "resuma essa pagina",
-            "analise esta url", "analise essa url", "leia esta url", "leia esse link"
-        ],
-
-        # Comandos do sistema (PowerShell)
-        "system_command": [
-            "executa o comando", "execute o comando", "rodar comando", "rode o comando",
-            "no powershell", "powershell:"
-        ],
-
-        # Temporizador
-        "set_timer": [
-            "temporizador", "timer", "cronometro", "cronmetro", "me avisa em", "me lembre em"
-        ],
-
-        # Calendrio
-        "schedule_calendar": [
-            "agenda", "agendar", "calendario", "calendrio", "marcar no calendario", "marcar no calendrio", "compromisso"
-        ],
-
-        # Status do sistema (CPU/RAM/Disco)
-        "system_status": [
-            "uso de cpu", "uso da cpu", "cpu", "processador",
-            "uso de ram", "uso da ram", "memoria ram", "memria ram", "ram",
-            "uso do disco", "disco cheio", "armazenamento",
-            "status do sistema", "desempenho do sistema", "monitoramento"
-        ],
-
-        # Controle de tela (clique, movimento)
-        "control_screen": [
-            "clica aqui", "clique aqui", "click here",
-            "mova o mouse", "moves o mouse", "arrasta", "arraste"
-        ],
-
-        # Navegao visual (clica em boto especfico)
-        "visual_navigate": [
-            "clica no", "clique no", "clica em", "clique em",
-            "aperta o", "aperte o", "pressiona o", "pressione o"
-        ],
-
-        # Digitar texto
-        "type_text": [
-            "digite", "digita", "escreva", "escreve", "type"
-        ],
-
-        # Clima (apenas quando for sobre clima mesmo, no tempo genrico)
-        "weather_report": [
-            "qual o clima", "como est o clima", "previso do tempo",
-            "vai chover", "temperatura", "graus", "est frio", "est quente",
-            "tempo em", "clima em", "weather in", "tempo hoje", "clima hoje"
-        ],
-
-        # Arquivos
-        "file_operation": [
-            "cria arquivo", "criar arquivo", "delete arquivo", "apaga arquivo",
-            "cria pasta", "criar pasta", "delete pasta", "apaga pasta",
-            "lista arquivo", "listar arquivo", "l arquivo", "ler arquivo"
-        ],
-
-        # Projetos
-        "project_manager": [
-            "comea projeto", "comear projeto", "inicia projeto", "iniciar projeto",
-            "novo projeto", "criar projeto", "encerra projeto", "sair projeto"
-        ],
-
-        # Msica/Media
-        "play_media": [
-            "toca", "tocar", "play", "msica", "musica", "som"
-        ],
-        "remember_note": [
-            "lembra de", "lembre de", "memoriza", "memorizar", "guarda isso",
-            "guarde isso", "salva isso", "salvar isso", "anota", "anote"
-        ],
-        "search_personal_data": [
-            "o que voce lembra", "o que você lembra", "o que sabe sobre",
-            "me lembra sobre", "buscar na memoria", "buscar na memória",
-            "procura nas minhas notas", "procure nas minhas notas"
-        ],
-        "clear_popups": [
-            "limpa popup", "limpar popups", "fechar popups", "sumir popups",
-            "limpa alertas", "limpar alertas", "fechar alertas"
-        ],
-    }
+        # Extrair parmetros bsicos
+        params = {}
 
-    # Verificar cada padro (ordem importa!)
-    for intent, keywords in intent_patterns.items():
-        for keyword in keywords:
-            if _keyword_match(keyword):
-                print(f"[KEYWORD] detectada: '{keyword}' -> intent={intent}")
-
-                # Extrair parmetros bsicos
-                params = {}
-
-                if intent == "describe_screen":
-                    # Sem parmetros necessrios
-                    params = {}
-
-                elif intent == "open_app":
-                    params = {}
-                    # Tenta extrair nome do app (expandido com mais apps)
-                    apps_map = {
-                        # Navegadores
-                        "chrome": ["chrome", "google chrome"],
-                        "firefox": ["firefox", "fire fox", "mozilla"],
-                        "edge": ["edge", "microsoft edge"],
-                        "opera": ["opera", "opera gx", "operagx"],
-                        "brave": ["brave"],
-
-                        # IDEs e editores
-                        "vscode": ["vscode", "vs code", "visual studio code", "code"],
-                        "pycharm": ["pycharm"],
-                        "sublime": ["sublime", "sublime text"],
-                        "notepad": ["notepad", "bloco de notas", "notepad++"],
-
-                        # Comunicao
-                        "discord": ["discord"],
-                        "slack": ["slack"],
-                        "teams": ["teams", "microsoft teams"],
-                        "zoom": ["zoom"],
-                        "whatsapp": ["whatsapp", "whats"],
-                        "telegram": ["telegram"],
-
-                        # Mdia
-                        "spotify": ["spotify"],
-                        "vlc": ["vlc"],
-
-                        # Outros
-                        "terminal": ["terminal", "cmd", "prompt"],
-                        "explorer": ["explorer", "explorador", "arquivos"],
-                    }
-
-                    for app_key, app_variations in apps_map.items():
-                        for variation in app_variations:
-                            if variation in text_lower:
-                                params = {"app_name": app_key}
-                                break
-                        if params:
-                            break
-
-                elif intent == "close_app":
-                    params = {}
-                    # Mesma lgica para fechar apps
-                    apps_map = {
-                        "chrome": ["chrome", "google chrome"],
-                        "firefox": ["firefox", "fire fox", "mozilla"],
-                        "edge": ["edge", "microsoft edge"],
-                        "opera": ["opera", "opera gx", "operagx", "navegador"],
-                        "brave": ["brave"],
-                        "vscode": ["vscode", "vs code", "visual studio code", "code"],
-                        "discord": ["discord"],
-                        "spotify": ["spotify"],
-                        "whatsapp": ["whatsapp", "whats"],
-                        "telegram": ["telegram"],
-                        "notepad": ["notepad", "bloco de notas"],
-                    }
-
-                    for app_key, app_variations in apps_map.items():
-                        for variation in app_variations:
-                            if variation in text_lower:
-                                params = {"app_name": app_key}
-                                break
-                        if params:
-                            break
-
-                elif intent == "open_website":
-                    params = {}
-                    # Tenta extrair URL
-                    urls = ["youtube.com", "google.com", "facebook.com", "instagram.com", "twitter.com", "github.com"]
-                    for url in urls:
-                        if url in text_lower:
-                            params = {"url": url}
-                            break
-
-                    # Se no achou URL especfica mas tem palavras-chave
-                    if not params and any(x in text_lower for x in ["site", "pgina", "acessa"]):
-                        # Tentar extrair domnio
-                        words = text_lower.split()
-                        for word in words:
-                            if ".com" in word or ".br" in word or ".org" in word:
-                                params = {"url": word}
-                                break
-
-                elif intent == "search_web":
-                    cleaned = re.sub(
-                        r"\b(pesquise|pesquisar|procure|procurar|busque|buscar|na internet|na web)\b",
-                        "",
-                        user_text,
-                        flags=re.IGNORECASE,
-                    ).strip(" :,-")
-                    params = {"query": cleaned or user_text}
-
-                elif intent == "fetch_web_content":
-                    params = {}
-                    m = re.search(r"(https://\S+)", user_text, flags=re.IGNORECASE)
-                    if m:
-                        params["url"] = m.group(1).rstrip(".,;)")
-                    else:
-                        words = re.split(r"\s+", user_text.strip())
-                        for word in words:
-                            token = word.strip(".,;)")
-                            if any(token.lower().startswith(prefix) for prefix in ("www.",)) or \
-                               any(token.lower().endswith(suffix) for suffix in (".com", ".com.br", ".org", ".net", ".io", ".dev", ".ai", ".gov", ".edu")):
-                                if not token.lower().startswith(("http://", "https://")):
-                                    token = "https://" + token
-                                params["url"] = token
-                                break
-                    if params.get("url"):
-                        lower = user_text.lower()
-                        marker = "sobre "
-                        if marker in lower:
-                            idx = lower.index(marker) + len(marker)
-                            q = user_text[idx:].strip()
-                            if q:
-                                params["question"] = q
-
-                elif intent == "system_command":
-                    cmd = user_text
-                    if "powershell:" in text_lower:
-                        cmd = user_text.split("powershell:", 1)[1].strip()
-                    elif "executa o comando" in text_lower:
-                        cmd = user_text.split("executa o comando", 1)[1].strip()
-                    elif "execute o comando" in text_lower:
-                        cmd = user_text.split("execute o comando", 1)[1].strip()
-                    elif "rodar comando" in text_lower:
-                        cmd = user_text.split("rodar comando", 1)[1].strip()
-                    elif "rode o comando" in text_lower:
-                        cmd = user_text.split("rode o comando", 1)[1].strip()
-                    params = {"command": cmd.strip()} if cmd else {}
-
-                elif intent == "set_timer":
-                    # Best-effort parse for durations. Prefer local fast-path in get_llm_output.
+        if intent == "describe_screen":
+            # Sem parmetros necessrios
+            params = {}
+
+        elif intent == "open_app":
+            params = {}
+            # Tenta extrair nome do app (expandido com mais apps)
+            apps_map = {
+                # Navegadores
+                "chrome": ["chrome", "google chrome"],
+                "firefox": ["firefox", "fire fox", "mozilla"],
+                "edge": ["edge", "microsoft edge"],
+                "opera": ["opera", "opera gx", "operagx"],
+                "brave": ["brave"],
+
+                # IDEs e editores
+                "vscode": ["vscode", "vs code", "visual studio code", "code"],
+                "pycharm": ["pycharm"],
+                "sublime": ["sublime", "sublime text"],
+                "notepad": ["notepad", "bloco de notas", "notepad++"],
+
+                # Comunicao
+                "discord": ["discord"],
+                "slack": ["slack"],
+                "teams": ["teams", "microsoft teams"],
+                "zoom": ["zoom"],
+                "whatsapp": ["whatsapp", "whats"],
+                "telegram": ["telegram"],
+
+                # Mdia
+                "spotify": ["spotify"],
+                "vlc": ["vlc"],
+
+                # Outros
+                "terminal": ["terminal", "cmd", "prompt"],
+                "explorer": ["explorer", "explorador", "arquivos"],
+            }
+
+            for app_key, app_variations in apps_map.items():
+                for variation in app_variations:
+                    if variation in text_lower:
+                        params = {"app_name": app_key}
+                        break
+                if params:
+                    break
+
+        elif intent == "close_app":
+            params = {}
+            # Mesma lgica para fechar apps
+            apps_map = {
+                "chrome": ["chrome", "google chrome"],
+                "firefox": ["firefox", "fire fox", "mozilla"],
+                "edge": ["edge", "microsoft edge"],
+                "opera": ["opera", "opera gx", "operagx", "navegador"],
+                "brave": ["brave"],
+                "vscode": ["vscode", "vs code", "visual studio code", "code"],
+                "discord": ["discord"],
+                "spotify": ["spotify"],
+                "whatsapp": ["whatsapp", "whats"],
+                "telegram": ["telegram"],
+                "notepad": ["notepad", "bloco de notas"],
+            }
+
+            for app_key, app_variations in apps_map.items():
+                for variation in app_variations:
+                    if variation in text_lower:
+                        params = {"app_name": app_key}
+                        break
+                if params:
+                    break
+
+        elif intent == "open_website":
+            params = {}
+            # Tenta extrair URL
+            urls = ["youtube.com", "google.com", "facebook.com", "instagram.com", "twitter.com", "github.com"]
+            for url in urls:
+                if url in text_lower:
+                    params = {"url": url}
+                    break
+
+            # Se no achou URL especfica mas tem palavras-chave
+            if not params and any(x in text_lower for x in ["site", "pgina", "acessa"]):
+                # Tentar extrair domnio
+                words = text_lower.split()
+                for word in words:
+                    if ".com" in word or ".br" in word or ".org" in word:
+                        params = {"url": word}
+                        break
+
+        elif intent == "search_web":
+            cleaned = re.sub(
+                r"\b(pesquise|pesquisar|procure|procurar|busque|buscar|na internet|na web)\b",
+                "",
+                user_text,
+                flags=re.IGNORECASE,
+            ).strip(" :,-")
+            params = {"query": cleaned or user_text}
+
+        elif intent == "fetch_web_content":
+            params = {}
+            m = re.search(r"(https://\S+)", user_text, flags=re.IGNORECASE)
+            if m:
+                params["url"] = m.group(1).rstrip(".,;)")
+            else:
+                m = _RE_URLISH.search(user_text)
+                if m:
+                    token = m.group(1).strip(".,;)")
+                    if not token.lower().startswith(("http://", "https://")):
+                        token = "https://" + token
+                    params["url"] = token
+            if params.get("url"):
+                lower = user_text.lower()
+                marker = "sobre "
+                if marker in lower:
+                    idx = lower.index(marker) + len(marker)
+                    q = user_text[idx:].strip()
+                    if q:
+                        params["question"] = q
+
+        elif intent == "system_command":
+            cmd = user_text
+            for marker in _COMMAND_MARKERS:
+                idx = text_lower.find(marker)
+                if idx >= 0:
+                    # Posicao achada no texto minusculo, fatia no original (preserva caixa)
+                    cmd = user_text[idx + len(marker):].strip()
+                    break
+            params = {"command": cmd.strip()} if cmd else {}
+
+        elif intent == "set_timer":
+            # Best-effort parse for durations. Prefer local fast-path in get_llm_output.
+            hours = 0
+            minutes = 0
+            seconds = 0
+
+            mh = re.search(r"(\d+)\s*(h|hora|horas)\b", text_lower)
+            if mh:
+                try:
+                    hours = int(mh.group(1))
+                except Exception:
                     hours = 0
+            mm = re.search(r"(\d+)\s*(m|min|minuto|minutos)\b", text_lower)
+            if mm:
+                try:
+                    minutes = int(mm.group(1))
+                except Exception:
                     minutes = 0
+            ms = re.search(r"(\d+)\s*(s|seg|segundo|segundos)\b", text_lower)
+            if ms:
+                try:
+                    seconds = int(ms.group(1))
+                except Exception:
                     seconds = 0
 
-                    mh = re.search(r"(\d+)\s*(h|hora|horas)\b", text_lower)
-                    if mh:
-                        try:
-                            hours = int(mh.group(1))
-                        except Exception:
-                            hours = 0
-                    mm = re.search(r"(\d+)\s*(m|min|minuto|minutos)\b", text_lower)
-                    if mm:
-                        try:
-                            minutes = int(mm.group(1))
-                        except Exception:
-                            minutes = 0
-                    ms = re.search(r"(\d+)\s*(s|seg|segundo|segundos)\b", text_lower)
-                    if ms:
-                        try:
-                            seconds = int(ms.group(1))
-                        except Exception:
-                            seconds = 0
-
-                    total = hours * 3600 + minutes * 60 + seconds
-                    if total > 0:
-                        params = {"duration_seconds": total, "system_notification": True}
-
-                elif intent == "schedule_calendar":
-                    # Keep it minimal here; the LLM should provide ISO datetime.
-                    title = None
-                    if ":" in user_text:
-                        title = user_text.split(":")[-1].strip()
-                    if title:
-                        params = {"title": title}
-                    lower_u = text_lower
-                    if any(k in lower_u for k in ["todo dia", "diariamente", "cada dia"]):
-                        params["recurrence_freq"] = "DAILY"
-                    elif any(k in lower_u for k in ["toda semana", "semanalmente", "cada semana"]):
-                        params["recurrence_freq"] = "WEEKLY"
-                    elif any(k in lower_u for k in ["todo mes", "todo mês", "mensalmente", "cada mes", "cada mês"]):
-                        params["recurrence_freq"] = "MONTHLY"
-                    mr = re.search(r"(\d+)\s*(min|minuto|minutos)\s*(antes|de antecedencia|de antecedência)", lower_u)
-                    if mr:
-                        try:
-                            params["reminder_minutes"] = int(mr.group(1))
-                        except Exception:
-                            pass
-
-                elif intent == "visual_navigate":
-                    # Tenta extrair alvo do clique
-                    target_words = text_lower.replace("clica no ", "").replace("clique no ", "")
-                    target_words = target_words.replace("clica em ", "").replace("clique em ", "")
-                    target_words = target_words.replace("aperta o ", "").replace("aperte o ", "")
-                    params = {"target": target_words.strip()}
-
-                elif intent == "weather_report":
-                    # Tenta extrair cidade
-                    cities = ["so paulo", "rio de janeiro", "braslia", "salvador", "fortaleza", "belo horizonte"]
-                    for city in cities:
-                        if city in text_lower:
-                            params = {"city": city.title()}
-                            break
-                    if not params:
-                        params = {"city": "So Paulo"}  # default
-
-                elif intent == "play_media":
-                    # Tenta extrair query
-                    query = text_lower.replace("toca ", "").replace("tocar ", "").replace("play ", "")
-                    params = {"query": query.strip()}
-
-                elif intent == "remember_note":
-                    note = text_lower
-                    for prefix in ["lembra de", "lembre de", "memoriza", "memorizar", "guarda isso", "guarde isso", "salva isso", "salvar isso", "anota", "anote"]:
-                        if prefix in note:
-                            note = note.split(prefix, 1)[1].strip()
-                            break
-                    params = {"note": note} if note else {}
-
-                elif intent == "search_personal_data":
-                    cleaned = text_lower
-                    for prefix in [
-                        "o que voce lembra", "o que você lembra", "o que sabe sobre",
-                        "me lembra sobre", "buscar na memoria", "buscar na memória",
-                        "procura nas minhas notas", "procure nas minhas notas"
-                    ]:
-                        if prefix in cleaned:
-                            cleaned = cleaned.split(prefix, 1)[1].strip()
-                            break
-                    params = {"query": cleaned or user_text}
+            total = hours * 3600 + minutes * 60 + seconds
+            if total > 0:
+                params = {"duration_seconds": total, "system_notification": True}
+
+        elif intent == "schedule_calendar":
+            # Keep it minimal here; the LLM should provide ISO datetime.
+            title = None
+            if ":" in user_text:
+                title = user_text.split(":")[-1].strip()
+            if title:
+                params = {"title": title}
+            lower_u = text_lower
+            if any(k in lower_u for k in ["todo dia", "diariamente", "cada dia"]):
+                params["recurrence_freq"] = "DAILY"
+            elif any(k in lower_u for k in ["toda semana", "semanalmente", "cada semana"]):
+                params["recurrence_freq"] = "WEEKLY"
+            elif any(k in lower_u for k in ["todo mes", "todo mês", "mensalmente", "cada mes", "cada mês"]):
+                params["recurrence_freq"] = "MONTHLY"
+            mr = re.search(r"(\d+)\s*(min|minuto|minutos)\s*(antes|de antecedencia|de antecedência)", lower_u)
+            if mr:
+                try:
+                    params["reminder_minutes"] = int(mr.group(1))
+                except Exception:
+                    pass
+
+        elif intent == "visual_navigate":
+            # Tenta extrair alvo do clique
+            target_words = text_lower.replace("clica no ", "").replace("clique no ", "")
+            target_words = target_words.replace("clica em ", "").replace("clique em ", "")
+            target_words = target_words.replace("aperta o ", "").replace("aperte o ", "")
+            params = {"target": target_words.strip()}
+
+        elif intent == "weather_report":
+            # Tenta extrair cidade
+            cities = ["so paulo", "rio de janeiro", "braslia", "salvador", "fortaleza", "belo horizonte"]
+            for city in cities:
+                if city in text_lower:
+                    params = {"city": city.title()}
+                    break
+            if not params:
+                params = {"city": "So Paulo"}  # default
+
+        elif intent == "play_media":
+            # Tenta extrair query
+            query = _PLAY_PREFIX_RE.sub("", text_lower)
+            params = {"query": query.strip()}
+
+        elif intent == "remember_note":
+            m = _NOTE_PREFIX_RE.search(text_lower)
+            note = m.group(2).strip() if m else text_lower
+            params = {"note": note} if note else {}
+
+        elif intent == "search_personal_data":
+            m = _MEMORY_QUERY_PREFIX_RE.search(text_lower)
+            cleaned = m.group(2).strip() if m else text_lower
+            params = {"query": cleaned or user_text}
 
-                return (intent, params)
+        return (intent, params)
 
     # Nenhuma keyword detectada
     return (None, {})
@@ -1591,6 +1827,24 @@ def _fallback_intent_from_text(user_text: str) -> dict | None:
     step = _build_step(intent, params)
     return _build_envelope(plan=[step], goal=user_text)
 
+
+def _envelope_from_keywords(user_text: str) -> dict | None:
+    """Plano direto por keywords quando o LLM nao esta disponivel ou falhou."""
+    detected_intent, detected_params = detect_intent_by_keywords(user_text)
+    if not detected_intent:
+        return None
+    if detected_intent in {"open_app", "close_app"} and not detected_params.get("app_name"):
+        return _canned_envelope(_CLARIFY_APP_NAME_ENVELOPE, goal=user_text)
+    step = _build_step(detected_intent, detected_params)
+    return _build_envelope(plan=[step], goal=user_text)
+
+
+# Intents detectadas por keyword que NAO sobrescrevem um "chat" com texto.
+_CHAT_OVERRIDE_EXCLUDED_INTENTS = frozenset({"weather_report", "play_media"})
+# Chaves que indicam que o Trinity devolveu so metadados, sem resposta.
+_TRINITY_METADATA_KEYS = frozenset({"username", "message", "time", "date", "timezone", "user", "timestamp"})
+
+
 def normalize_trinity_response(parsed: dict, user_text: str) -> dict:
     """
     Normaliza resposta do Trinity que pode vir em formatos diferentes.
@@ -1599,6 +1853,15 @@ def normalize_trinity_response(parsed: dict, user_text: str) -> dict:
     if not parsed:
         return None
 
+    # Deteccao por keywords feita no maximo uma vez, e so se algum ramo precisar.
+    detected = None
+
+    def _detect() -> tuple[str | None, dict]:
+        nonlocal detected
+        if detected is None:
+            detected = detect_intent_by_keywords(user_text)
+        return detected
+
     # Formato correto j (mas verifica se intent no  chat quando deveria ser ao)
     if "intent" in parsed and "text" in parsed:
         intent = parsed.get("intent")
@@ -1611,7 +1874,7 @@ def normalize_trinity_response(parsed: dict, user_text: str) -> dict:
             action_intent = first_action.get("intent")
             action_params = first_action.get("parameters", {})
 
-            print(f" Trinity retornou actions: {action_intent} com params {action_params}")
+            logger.debug(" Trinity retornou actions: %s com params %s", action_intent, action_params)
 
             # Usar a ao ao invs do chat
             # IMPORTANTE: Mantm o texto para falar ANTES de executar
@@ -1627,14 +1890,12 @@ def normalize_trinity_response(parsed: dict, user_text: str) -> dict:
         # Se Trinity disse "chat" E j tem texto, confie nele (no sobrescreva)
         if intent == "chat" and text:
             # MAS: verifica se tem keywords bvias de ao
-            detected_intent, detected_params = detect_intent_by_keywords(user_text)
+            detected_intent, detected_params = _detect()
 
             # Se detectou ao clara (no weather/media), sobrescreve
             # Aes claras: open_app, close_app, describe_screen, brightness, volume, etc.
-            excluded_intents = ["weather_report", "play_media"]
-
-            if detected_intent and detected_intent not in excluded_intents:
-                print(f" Trinity disse 'chat' mas detectei ao clara '{detected_intent}' - sobrescrevendo")
+            if detected_intent and detected_intent not in _CHAT_OVERRIDE_EXCLUDED_INTENTS:
+                logger.debug(" Trinity disse 'chat' mas detectei ao clara '%s' - sobrescrevendo", detected_intent)
                 return {
                     "intent": detected_intent,
                     "parameters": detected_params,
@@ -1644,14 +1905,14 @@ def normalize_trinity_response(parsed: dict, user_text: str) -> dict:
                     "memory_update": parsed.get("memory_update")
                 }
 
-            print(" Trinity retornou chat com texto - confiando na resposta")
+            logger.debug(" Trinity retornou chat com texto - confiando na resposta")
             return parsed
 
         # Se Trinity disse "chat" mas NO tem texto, pode ser uma ao
         if intent == "chat" and not text:
-            detected_intent, detected_params = detect_intent_by_keywords(user_text)
+            detected_intent, detected_params = _detect()
             if detected_intent:
-                print(f" Trinity disse 'chat' sem texto - detectei '{detected_intent}' por keywords")
+                logger.debug(" Trinity disse 'chat' sem texto - detectei '%s' por keywords", detected_intent)
                 parsed["intent"] = detected_intent
                 parsed["parameters"] = detected_params
                 parsed["text"] = None
@@ -1660,9 +1921,9 @@ def normalize_trinity_response(parsed: dict, user_text: str) -> dict:
 
     # Formato OpenAI (role/content)
     if "role" in parsed and "content" in parsed:
-        print(" Normalizando formato OpenAI -> Crono")
+        logger.debug(" Normalizando formato OpenAI -> Crono")
         # Tenta detectar intent por keywords
-        detected_intent, detected_params = detect_intent_by_keywords(user_text)
+        detected_intent, detected_params = _detect()
 
         return {
             "intent": detected_intent or "chat",
@@ -1673,10 +1934,9 @@ def normalize_trinity_response(parsed: dict, user_text: str) -> dict:
         }
 
     # Detectar se  apenas metadados (username, message, time, etc)
-    metadata_keys = {"username", "message", "time", "date", "timezone", "user", "timestamp"}
-    if metadata_keys.intersection(parsed.keys()):
-        print(" Trinity retornou metadados - detectando intent por keywords")
-        detected_intent, detected_params = detect_intent_by_keywords(user_text)
+    if not _TRINITY_METADATA_KEYS.isdisjoint(parsed):
+        logger.debug(" Trinity retornou metadados - detectando intent por keywords")
+        detected_intent, detected_params = _detect()
 
         return {
             "intent": detected_intent or "chat",
@@ -1688,14 +1948,14 @@ def normalize_trinity_response(parsed: dict, user_text: str) -> dict:
 
     # Formato com "content" mas sem "role"
     if "content" in parsed and "text" not in parsed:
-        print(" Normalizando 'content' -> 'text'")
+        logger.debug(" Normalizando 'content' -> 'text'")
         parsed["text"] = parsed["content"]
 
         if "intent" not in parsed or parsed.get("intent") == "chat":
             # Tenta detectar intent
-            detected_intent, detected_params = detect_intent_by_keywords(user_text)
+            detected_intent, detected_params = _detect()
             if detected_intent:
-                print(f" Detectei intent '{detected_intent}' por keywords")
+                logger.debug(" Detectei intent '%s' por keywords", detected_intent)
                 parsed["intent"] = detected_intent
                 parsed["parameters"] = detected_params
                 parsed["text"] = None  # Aes no tm texto
@@ -1705,8 +1965,8 @@ def normalize_trinity_response(parsed: dict, user_text: str) -> dict:
 
     # Se tem text mas no tem intent
     if "text" in parsed and "intent" not in parsed:
-        print(" Adicionando intent")
-        detected_intent, detected_params = detect_intent_by_keywords(user_text)
+        logger.debug(" Adicionando intent")
+        detected_intent, detected_params = _detect()
         parsed["intent"] = detected_intent or "chat"
         if detected_intent:
             parsed["parameters"] = detected_params
@@ -1722,9 +1982,9 @@ def normalize_trinity_response(parsed: dict, user_text: str) -> dict:
     )
 
     # ltima tentativa de detectar intent
-    detected_intent, detected_params = detect_intent_by_keywords(user_text)
+    detected_intent, detected_params = _detect()
 
-    print(f" Fallback: intent={detected_intent or 'chat'}")
+    logger.debug(" Fallback: intent=%s", detected_intent or "chat")
     return {
         "intent": detected_intent or "chat",
         "parameters": detected_params or parsed.get("parameters", {}),
@@ -1748,35 +2008,39 @@ def get_llm_output(
 ) -> dict:
     global LLM_USE_PROMPT_CACHE
     """Processa entrada do usuario e retorna um plano estruturado."""
-    print(f"LLM recebeu: '{user_text}'")
+    logger.debug("LLM recebeu: '%s'", user_text)
 
     if not user_text or not user_text.strip():
-        return _build_envelope(response="Desculpe, nao entendi.", goal="Conversa")
+        return _canned_envelope(_NOT_UNDERSTOOD_ENVELOPE)
+
+    # Chave normalizada uma unica vez por turno, reaproveitada pelos fast-paths.
+    t = _normalize_key(user_text)
 
     # Local fast-paths
     # Timer before time-question to avoid collisions such as:
     # "faz um timer pra meio dia" being interpreted as "quanto falta para meio-dia".
-    local_timer = _maybe_handle_timer_request(user_text)
-    if local_timer:
-        return local_timer
-    
-    local_time = _maybe_handle_time_question(user_text)
-    if local_time:
-        return local_time
-
-    local_web = _maybe_handle_web_search_request(user_text)
-    if local_web:
-        return local_web
+    if _FAST_PATH_TRIGGER_RE.search(t):
+        local_timer = _maybe_handle_timer_request(user_text, t)
+        if local_timer:
+            return local_timer
+
+        local_time = _maybe_handle_time_question(user_text, t)
+        if local_time:
+            return local_time
 
-    local_weather = _maybe_handle_weather_request(user_text)
-    if local_weather:
-        return local_weather
+        local_web = _maybe_handle_web_search_request(user_text, t)
+        if local_web:
+            return local_web
 
-    local_playlist = _maybe_handle_playlist_request(user_text)
-    if local_playlist:
-        return local_playlist
+        local_weather = _maybe_handle_weather_request(user_text, t)
+        if local_weather:
+            return local_weather
+
+        local_playlist = _maybe_handle_playlist_request(user_text, t)
+        if local_playlist:
+            return local_playlist
 
-    memory_answer = _maybe_answer_from_memory(user_text, memory_block)
+    memory_answer = _maybe_answer_from_memory(user_text, memory_block, t)
     if memory_answer:
         return memory_answer
 
@@ -1784,17 +2048,10 @@ def get_llm_output(
         init_cerebro_runtime()
 
     if not LLM_CLIENT:
-        detected_intent, detected_params = detect_intent_by_keywords(user_text)
-        if detected_intent:
-            if detected_intent in {"open_app", "close_app"} and not detected_params.get("app_name"):
-                return _build_envelope(
-                    needs_clarification=True,
-                    clarifying_question="Qual o nome exato do aplicativo",
-                    goal=user_text,
-                )
-            step = _build_step(detected_intent, detected_params)
-            return _build_envelope(plan=[step], goal=user_text)
-        return _build_envelope(response="IA principal indisponivel. Posso executar acoes diretas se voce pedir.", goal="Conversa")
+        keyword_env = _envelope_from_keywords(user_text)
+        if keyword_env:
+            return keyword_env
+        return _canned_envelope(_LLM_UNAVAILABLE_ENVELOPE)
 
     memory_context = _format_memory_context(memory_block)
 
@@ -1813,26 +2070,17 @@ def get_llm_output(
                     ),
                 }
             )
-        if allow_reasoning_hint and _needs_reasoning_hint(user_text):
-            messages.append(
-                {
-                    "role": "system",
-                    "content": "Use reasoning to explain your plan before responding when helpful.",
-                }
-            )
+        reasoning_hint = allow_reasoning_hint and _needs_reasoning_hint(user_text, t)
+        if reasoning_hint:
+            messages.append(_REASONING_HINT_MESSAGE)
         use_structured = LLM_STRUCTURED_OUTPUTS if structured_outputs is None else bool(structured_outputs)
         use_tooling = LLM_USE_TOOLS if use_tools is None else bool(use_tools)
         if use_structured:
-            messages.append(
-                {
-                    "role": "system",
-                    "content": _structured_schema_prompt(),
-                }
-            )
+            messages.append(_STRUCTURED_SCHEMA_MESSAGE)
         messages.append({"role": "user", "content": user_prompt})
 
         reffort = reasoning_effort or LLM_REASONING_EFFORT
-        if allow_reasoning_hint and _needs_reasoning_hint(user_text):
+        if reasoning_hint:
             reffort = "high"
         rformat = reasoning_format or LLM_REASONING_FORMAT
         rinclude = LLM_INCLUDE_REASONING if include_reasoning is None else bool(include_reasoning)
@@ -1882,7 +2130,6 @@ def get_llm_output(
             raise RuntimeError("LLM indisponvel")
         if use_cache:
             cache_id = _extract_cache_id(resp)
-            fp = _cache_fingerprint(LLM_MODEL, SYSTEM_PROMPT or "", memory_context or "")
             if cache_id:
                 _LLM_CACHE_ID = cache_id
                 _LLM_CACHE_FINGERPRINT = fp
@@ -1944,16 +2191,8 @@ def get_llm_output(
                     plain_args.pop("tools", None)
                     plain_args.pop("tool_choice", None)
                     # Remove schema prompt se existir
-                    plain_messages = [
-                        m for m in messages
-                        if not (m.get("role") == "system" and "Return ONLY valid JSON" in (m.get("content") or ""))
-                    ]
-                    plain_messages.append(
-                        {
-                            "role": "system",
-                            "content": "Responda diretamente em texto simples, sem JSON.",
-                        }
-                    )
+                    plain_messages = [m for m in messages if m is not _STRUCTURED_SCHEMA_MESSAGE]
+                    plain_messages.append(_PLAIN_TEXT_MESSAGE)
                     plain_args["messages"] = plain_messages
                     plain_args["max_tokens"] = 600
                     plain_args["temperature"] = 0.3
@@ -1975,17 +2214,20 @@ def get_llm_output(
         if normalized:
             return normalized
     except Exception as e:
-        print(f"Groq LLM falhou: {e}")
+        logger.warning("Groq LLM falhou: %s", e)
 
-    detected_intent, detected_params = detect_intent_by_keywords(user_text)
-    if detected_intent:
-        if detected_intent in {"open_app", "close_app"} and not detected_params.get("app_name"):
-            return _build_envelope(
-                needs_clarification=True,
-                clarifying_question="Qual o nome exato do aplicativo",
-                goal=user_text,
-            )
-        step = _build_step(detected_intent, detected_params)
-        return _build_envelope(plan=[step], goal=user_text)
+    keyword_env = _envelope_from_keywords(user_text)
+    if keyword_env:
+        return keyword_env
+
+    return _canned_envelope(_RETRY_ENVELOPE)
 
-    return _build_envelope(response="Desculpe, tive um problema. Tenta de novo", goal="Conversa")
+
+async def get_llm_output_async(user_text: str, **kwargs) -> dict:
+    """
+    Variante async de get_llm_output para quem roda num event loop.
+    As chamadas HTTP (OpenRouter/Groq) sao sincronas, entao o turno roda
+    numa thread do executor padrao e o loop segue livre (TTS, interrupcoes).
+    """
+    import asyncio
+    return await asyncio.to_thread(get_llm_output, user_text, **kwargs)
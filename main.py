@@ -14,7 +14,9 @@ import os
 import sys
 import threading
 import asyncio
+import logging
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from importlib.util import find_spec
 
 # Ensure correct path
@@ -45,16 +47,13 @@ def check_dependencies() -> bool:
         # Add optional imports here if you decide to make features non-blocking
     }
 
-    missing_required = []
-    missing_optional = []
+    # find_spec e so stat no sys.path (I/O): sonda todos os pacotes em paralelo
+    probes = {**required, **optional}
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        specs = dict(zip(probes, pool.map(find_spec, probes.values())))
 
-    for pip_name, import_name in required.items():
-        if find_spec(import_name) is None:
-            missing_required.append(pip_name)
-
-    for pip_name, import_name in optional.items():
-        if find_spec(import_name) is None:
-            missing_optional.append(pip_name)
+    missing_required = [pip_name for pip_name in required if specs[pip_name] is None]
+    missing_optional = [pip_name for pip_name in optional if specs[pip_name] is None]
 
     if missing_required or missing_optional:
         if missing_required:
@@ -102,12 +101,41 @@ def main():
     try:
         from ui import CronoUI
         from monitor_manager import setup_secondary_monitor_mode, move_window_to_primary, move_cmd_to_primary
-        from sts_orchestrator import CronoSTSOrchestrator
-        from llm import init_cerebro_runtime
 
         # Initialize UI
         ui = CronoUI(size=(720, 520))
         ui.attach_stdout_stderr()
+        # Depois do redirect: avisos vao para o log da UI; debug fica desligado.
+        # So os loggers "crono.*" em INFO: o root fica em WARNING para o httpx
+        # nao logar cada requisicao ao Groq
+        logging.basicConfig(level=logging.WARNING, format="%(message)s")
+        logging.getLogger("crono").setLevel(logging.INFO)
+
+        # Importa orquestrador/LLM (audio, TTS, visao...) e inicializa o cerebro
+        # numa thread enquanto a janela e posicionada no monitor.
+        prewarm = {}
+        prewarm_done = threading.Event()
+
+        def _prewarm():
+            try:
+                # Clima da saudacao inicial vai buscando enquanto o resto importa
+                from startup_greeting import prefetch_weather
+
+                prefetch_weather()
+            except Exception:
+                pass  # a saudacao consulta na hora
+            try:
+                from sts_orchestrator import CronoSTSOrchestrator
+                from llm import init_cerebro_runtime
+
+                init_cerebro_runtime()
+                prewarm["orchestrator_cls"] = CronoSTSOrchestrator
+            except Exception as e:
+                prewarm["error"] = e
+            finally:
+                prewarm_done.set()
+
+        threading.Thread(target=_prewarm, daemon=True).start()
 
         def _on_monitor_toggle(enabled: bool):
             if enabled:
@@ -122,14 +150,18 @@ def main():
         moved = setup_secondary_monitor_mode(ui.root, width=720, height=520)
         ui.set_monitor_state(moved)
         ui.maximize()
-        # Inicializar cerebro e prompt em ordem
-        init_cerebro_runtime()
-
-        # Initialize and run Orchestrator
-        orchestrator = CronoSTSOrchestrator(ui)
-
         def runner():
-            asyncio.run(orchestrator.run())
+            # Espera o prewarm aqui, nao na thread principal: a UI sobe na hora
+            prewarm_done.wait()
+            try:
+                if "error" in prewarm:
+                    raise prewarm["error"]
+                # Initialize and run Orchestrator
+                orchestrator = prewarm["orchestrator_cls"](ui)
+                asyncio.run(orchestrator.run())
+            except Exception as e:
+                print(f"Erro fatal ao iniciar: {e}")
+                print("".join(traceback.format_exception(type(e), e, e.__traceback__)))
 
         threading.Thread(target=runner, daemon=True).start()
 
@@ -2,67 +2,96 @@ import os
 import re
 import unicodedata
 import webbrowser
+from functools import lru_cache
 from streaming_tts import streaming_speak
 
-try:
-    import pyperclip
-except Exception:
-    pyperclip = None
+# pyperclip e importado so na primeira leitura do clipboard (o probe de
+# backend no import e lento sem xclip). None = ainda nao tentou; False = indisponivel
+_pyperclip = None
 
 _PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 PLAYLIST_DIR = os.path.join(_PROJECT_ROOT, "PLAYLISTS")
 
-_URL_RE = re.compile(r"(https://\S+|www\.\S+|youtu\.be/\S+)", re.IGNORECASE)
+# \S+ ja consome o token inteiro (linear, sem backtracking); a pontuacao final
+# e aparada depois no _extract_link
+_URL_RE = re.compile(r"https?://\S+|(www\.|youtu\.be/)\S+", re.IGNORECASE)
+# Verbo inicial do comando ("abre a playlist ..."): alternativas na ordem de prioridade
+_NAME_PREFIX_RE = re.compile(
+    r"^(?:abrir a|abre a|abrir|abre|tocar a|toca a|tocar|toca|play|ouvir a|ouvir"
+    r"|criar a|crie a|criar|crie|salvar a|salve a|salvar|salve|nova|novo) "
+)
+_CREATE_PLAYLIST_RE = re.compile(r"(?:criar|crie a|crie|nova|salvar|salve a|salve) playlist")
+# Caracteres proibidos em nome de arquivo, removidos via str.translate
+_FILENAME_DELETE = str.maketrans("", "", '<>:"/\\|*')
 
 
 def _extract_link(text: str | None) -> str | None:
     if not text:
         return None
-    match = _URL_RE.search(text.strip())
+    match = _URL_RE.search(text)
     if not match:
         return None
     link = match.group(0).rstrip('.,;:!)"]\'')
-    if link.startswith("www."):
-        link = "https://" + link
-    if link.startswith("youtu.be/"):
+    # Grupo 1 so casa nas formas sem esquema (www. / youtu.be/)
+    if match.group(1):
         link = "https://" + link
     return link
 
 
 def _get_clipboard_text() -> str | None:
-    if not pyperclip:
+    global _pyperclip
+    if _pyperclip is None:
+        try:
+            import pyperclip
+            _pyperclip = pyperclip
+        except Exception:
+            _pyperclip = False
+    if not _pyperclip:
         return None
     try:
-        return pyperclip.paste()
+        return _pyperclip.paste()
     except Exception:
         return None
 
 
+class _CombiningMarkTable(dict):
+    """
+    Tabela para str.translate: marcas combinantes (categoria Mn) -> None.
+    Preenchida sob demanda, cada codepoint passa por unicodedata.category uma vez.
+    """
+
+    def __missing__(self, cp: int):
+        value = None if unicodedata.category(chr(cp)) == "Mn" else cp
+        self[cp] = value
+        return value
+
+
+_COMBINING_TABLE = _CombiningMarkTable()
+
+
 def _strip_accents(text: str) -> str:
-    return "".join(
-        ch for ch in unicodedata.normalize("NFD", text)
-        if unicodedata.category(ch) != "Mn"
-    )
+    if text.isascii():
+        return text
+    return _strip_accents_cached(text)
+
+
+@lru_cache(maxsize=1024)
+def _strip_accents_cached(text: str) -> str:
+    # So o caminho nao-ASCII passa pelo cache; ASCII ja retorna direto
+    return unicodedata.normalize("NFD", text).translate(_COMBINING_TABLE)
 
 
+# Funcao pura (str | None -> str | None): nomes repetidos entre comandos viram lookup
+@lru_cache(maxsize=1024)
 def _normalize_playlist_name(raw_name: str | None) -> str | None:
     if not raw_name:
         return None
     text = _strip_accents(raw_name.strip().lower())
     text = text.strip("\"' ")
 
-    prefixes = [
-        "abrir a", "abre a", "abrir", "abre",
-        "tocar a", "toca a", "tocar", "toca",
-        "play", "ouvir a", "ouvir",
-        "criar a", "crie a", "criar", "crie",
-        "salvar a", "salve a", "salvar", "salve",
-        "nova", "novo"
-    ]
-    for prefix in prefixes:
-        if text.startswith(prefix + " "):
-            text = text[len(prefix):].strip()
-            break
+    m = _NAME_PREFIX_RE.match(text)
+    if m:
+        text = text[m.end():].strip()
 
     for marker in ["playlist", "lista de reproducao"]:
         if marker in text:
@@ -78,12 +107,17 @@ def _normalize_playlist_name(raw_name: str | None) -> str | None:
 def _sanitize_filename(name: str | None) -> str | None:
     if not name:
         return None
-    invalid_chars = '<>:"/\\|*'
-    cleaned = "".join(ch for ch in name if ch not in invalid_chars)
-    cleaned = cleaned.strip()
+    cleaned = name.translate(_FILENAME_DELETE).strip()
     return cleaned or None
 
 
+def _notify(player, msg: str) -> None:
+    # write_log so anexa na lista de logs da UI (em memoria), nao vale uma thread
+    if player:
+        player.write_log(msg)
+    streaming_speak(msg, player, blocking=True)
+
+
 def _resolve_action(parameters: dict, user_text: str | None) -> str:
     action = (parameters.get("action") or parameters.get("mode") or parameters.get("operation") or "").strip().lower()
     if parameters.get("create") is True:
@@ -92,35 +126,51 @@ def _resolve_action(parameters: dict, user_text: str | None) -> str:
         return "create"
     if user_text:
         text_lower = _strip_accents(user_text.lower())
-        if any(k in text_lower for k in [
-            "criar playlist", "crie a playlist", "crie playlist", "nova playlist",
-            "salvar playlist", "salve a playlist", "salve playlist"
-        ]):
+        if _CREATE_PLAYLIST_RE.search(text_lower):
             return "create"
     return "open"
 
 
+# Arquivos .txt da pasta de playlists com o nome ja normalizado, refeito so
+# quando o mtime da pasta muda (arquivo criado, removido ou renomeado).
+_PLAYLIST_CACHE = {"mtime": None, "entries": []}
+
+
+def _playlist_entries() -> list[tuple[str, str]]:
+    try:
+        mtime = os.stat(PLAYLIST_DIR).st_mtime_ns
+    except OSError:
+        return []
+    if _PLAYLIST_CACHE["mtime"] != mtime:
+        entries = []
+        with os.scandir(PLAYLIST_DIR) as it:
+            for entry in it:
+                if entry.name.lower().endswith(".txt"):
+                    base = _strip_accents(os.path.splitext(entry.name)[0].lower())
+                    entries.append((base, entry.name))
+        _PLAYLIST_CACHE["entries"] = entries
+        _PLAYLIST_CACHE["mtime"] = mtime
+    return _PLAYLIST_CACHE["entries"]
+
+
 def _find_playlist_file(target_name: str | None) -> str | None:
     if not target_name:
         return None
-    if not os.path.exists(PLAYLIST_DIR):
-        return None
-    files = [f for f in os.listdir(PLAYLIST_DIR) if f.lower().endswith(".txt")]
 
-    # Match priority: exact, startswith, contains
-    for f in files:
-        base = _strip_accents(os.path.splitext(f)[0].lower())
+    # Match priority: exact, startswith, contains (uma unica passada)
+    starts = contains = None
+    for base, f in _playlist_entries():
         if base == target_name:
             return os.path.join(PLAYLIST_DIR, f)
-    for f in files:
-        base = _strip_accents(os.path.splitext(f)[0].lower())
+        if starts is not None:
+            # Ja ha prefixo: "contains" nao seria usado, so falta procurar o exato
+            continue
         if base.startswith(target_name):
-            return os.path.join(PLAYLIST_DIR, f)
-    for f in files:
-        base = _strip_accents(os.path.splitext(f)[0].lower())
-        if target_name in base:
-            return os.path.join(PLAYLIST_DIR, f)
-    return None
+            starts = f
+        elif contains is None and target_name in base:
+            contains = f
+    found = starts or contains
+    return os.path.join(PLAYLIST_DIR, found) if found else None
 
 
 def play_playlist_action(
@@ -147,9 +197,7 @@ def play_playlist_action(
 
     if not name:
         msg = "Qual o nome da playlist, senhor"
-        if player:
-            player.write_log(msg)
-        streaming_speak(msg, player, blocking=True)
+        _notify(player, msg)
         return False
 
     target_name = _strip_accents(name.lower().strip())
@@ -160,9 +208,7 @@ def play_playlist_action(
             safe_name = safe_name[:-4]
         if not safe_name:
             msg = "Nao consegui entender o nome da playlist. Pode repetir"
-            if player:
-                player.write_log(msg)
-            streaming_speak(msg, player, blocking=True)
+            _notify(player, msg)
             return False
 
         if not os.path.exists(PLAYLIST_DIR):
@@ -174,19 +220,17 @@ def play_playlist_action(
 
         if not link:
             msg = "Nao encontrei nenhum link no seu copiar e colar. Copie o link do video e me peca para criar a playlist novamente."
-            if player:
-                player.write_log(msg)
-            streaming_speak(msg, player, blocking=True)
+            _notify(player, msg)
             return False
 
         playlist_path = os.path.join(PLAYLIST_DIR, f"{safe_name}.txt")
         try:
             with open(playlist_path, "w", encoding="utf-8") as f:
                 f.write(link + "\n")
+            # Nao depende da resolucao do mtime da pasta para ver a playlist nova
+            _PLAYLIST_CACHE["mtime"] = None
             msg = f"Playlist '{safe_name}' criada com sucesso."
-            if player:
-                player.write_log(msg)
-            streaming_speak(msg, player, blocking=True)
+            _notify(player, msg)
             return True
         except Exception as e:
             err = f"Erro ao criar a playlist: {e}"
@@ -202,10 +246,9 @@ def play_playlist_action(
     if found_file:
         try:
             with open(found_file, "r", encoding="utf-8") as f:
-                # Pega a primeira linha valida que parece um link
-                lines = f.readlines()
+                # Pega a primeira linha valida que parece um link (le so ate ela)
                 link = None
-                for line in lines:
+                for line in f:
                     clean = line.strip()
                     link = _extract_link(clean)
                     if link:
@@ -222,24 +265,19 @@ def play_playlist_action(
                 return True
             else:
                 err = f"A playlist '{name}' existe, mas nao encontrei um link valido nela."
-                if player:
-                    player.write_log(err)
-                streaming_speak(err, player, blocking=True)
+                _notify(player, err)
                 return False
 
         except Exception as e:
             print(f"Erro ao ler playlist: {e}")
             err = "Houve um erro ao tentar ler o arquivo da playlist."
-            if player:
-                player.write_log(err)
-            streaming_speak(err, player, blocking=True)
+            _notify(player, err)
             return False
 
     else:
         # Se nao achou, informa e lista as disponiveis
-        available = []
-        if os.path.exists(PLAYLIST_DIR):
-            available = [f.replace(".txt", "") for f in os.listdir(PLAYLIST_DIR) if f.lower().endswith(".txt")]
+        # Reaproveita a listagem em cache (scandir); corta so a extensao final
+        available = [f[:-4] for _, f in _playlist_entries()]
 
         msg = f"Nao encontrei a playlist '{name}', senhor."
         if available:
@@ -247,7 +285,5 @@ def play_playlist_action(
         else:
             msg += " A pasta de playlists esta vazia."
 
-        if player:
-            player.write_log(msg)
-        streaming_speak(msg, player, blocking=True)
+        _notify(player, msg)
         return False
@@ -1,23 +1,38 @@
+import atexit
 import json
 import os
 import re
 import threading
 import time
+from collections import deque
 from typing import List, Tuple
 
+from json_io import json_dumps, write_atomic
+
 
 class Mem0Lite:
     """
     Lightweight memory store with simple extraction and keyword search.
-    Stores items in a JSON file for persistence.
+    Stores items in a JSON file for persistence (writes coalesced, see _save).
     """
 
+    _FLUSH_DELAY = 0.25
+    _MAX_ITEMS = 1000
+
+    # Padroes de extracao, compilados uma vez (testados nesta ordem de prioridade)
+    _PREFERENCE_RE = re.compile(r"\blembre que gosto de\b(.+)$")
+    _NOTE_RE = re.compile(r"\b(?:lembre|lembra|memoriza|guarda|salva) que (.+)$")
+    _NAME_RE = re.compile(r"\bmeu nome e\b(.+)$")
+
     def __init__(self, base_dir: str | None = None, filename: str = "mem0.json"):
         base_dir = base_dir or os.getcwd()
         self.path = os.path.join(base_dir, filename)
         self._lock = threading.Lock()
-        self._items = []
+        # deque com maxlen: descarta os mais antigos em O(1)
+        self._items = deque(maxlen=self._MAX_ITEMS)
+        self._flush_timer = None
         self._load()
+        atexit.register(self.flush)
 
     def _load(self) -> None:
         if not os.path.exists(self.path):
@@ -26,16 +41,27 @@ class Mem0Lite:
             with open(self.path, "r", encoding="utf-8") as f:
                 data = json.load(f)
             if isinstance(data, list):
-                self._items = data
+                self._items = deque(data, maxlen=self._MAX_ITEMS)
         except Exception:
             return
 
     def _save(self) -> None:
-        try:
-            with open(self.path, "w", encoding="utf-8") as f:
-                json.dump(self._items, f, indent=2, ensure_ascii=False)
-        except Exception:
-            return
+        # Chamado com self._lock: agenda um unico flush por rajada de escritas
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self._FLUSH_DELAY, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._flush_timer is None:
+                return
+            self._flush_timer.cancel()
+            self._flush_timer = None
+            try:
+                write_atomic(self.path, json_dumps(list(self._items)))
+            except Exception:
+                return
 
     def extract_memories(self, text: str) -> List[Tuple[str, str, str]]:
         """
@@ -51,7 +77,7 @@ class Mem0Lite:
         memories: List[Tuple[str, str, str]] = []
 
         # Basic preference
-        m = re.search(r"\blembre que gosto de\b(.+)$", tl)
+        m = self._PREFERENCE_RE.search(tl)
         if m:
             value = m.group(1).strip()
             if value:
@@ -59,15 +85,15 @@ class Mem0Lite:
                 return memories
 
         # Remember note
-        m = re.search(r"\b(lembre|lembra|memoriza|guarda|salva) (:que )(.+)$", tl)
+        m = self._NOTE_RE.search(tl)
         if m:
-            value = m.group(2).strip()
+            value = m.group(1).strip()
             if value:
                 memories.append(("note", value, "lembrete"))
                 return memories
 
         # Name declaration
-        m = re.search(r"\bmeu nome e\b(.+)$", tl)
+        m = self._NAME_RE.search(tl)
         if m:
             value = m.group(1).strip()
             if value:
@@ -88,8 +114,6 @@ class Mem0Lite:
                     "tags": tags,
                 }
             )
-            if len(self._items) > 1000:
-                self._items = self._items[-1000:]
             self._save()
 
     def search(self, query: str, limit: int = 5) -> List[dict]:
@@ -106,4 +130,5 @@ class Mem0Lite:
                     hits.append(item)
                 if len(hits) >= limit:
                     break
-        return list(reversed(hits))
+        hits.reverse()
+        return hits
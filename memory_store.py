@@ -1,10 +1,18 @@
+import atexit
 import json
 import os
+import re
 import threading
 import time
 import uuid
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from collections import defaultdict, deque
+from datetime import date, datetime, timedelta
+from datetime import time as dtime
+from itertools import islice
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from json_io import json_dumps, write_atomic
+from token_index import TOKEN_RE, candidate_ids
 
 
 class MemoryStore:
@@ -13,8 +21,27 @@ class MemoryStore:
     - Short-term: last N messages (JSON)
     - Long-term: remembered notes/profile/project memories (JSON)
     - Visual: last screen/image description (JSON)
+    Writes are coalesced: setters mark a store dirty and one flush runs
+    shortly after a burst (and at exit).
     """
 
+    _FLUSH_DELAY = 0.25
+    _LONG_LIMIT = 5000
+    # Tudo que nao e alfanumerico, "_", "-" ou espaco vira separador no _slug
+    _SLUG_RE = re.compile(r"[^\w\s-]+")
+    # Expressoes de data -> (dias atras do inicio, dias atras do fim), meia-noite local.
+    # "anteontem" vem antes de "ontem" na alternancia para nao ser lida como "ontem".
+    _DATE_RE = re.compile(r"anteontem|antes de ontem|ontem|hoje|semana passada|m[eê]s passado")
+    _DATE_OFFSETS = {
+        "hoje": (0, -1),
+        "ontem": (1, 0),
+        "anteontem": (2, 1),
+        "antes de ontem": (2, 1),
+        "semana passada": (7, 0),
+    }
+    # Prioridade quando a consulta cita mais de uma expressao
+    _DATE_PRIORITY = ("hoje", "ontem", "anteontem", "antes de ontem", "semana passada")
+
     def __init__(
         self,
         base_dir: Optional[str] = None,
@@ -30,8 +57,15 @@ class MemoryStore:
         self.visual_path = os.path.join(base_dir, visual_file)
         self.short_limit = short_limit
         self._lock = threading.Lock()
-        self._short: List[Dict[str, Any]] = []
-        self._long_entries: List[Dict[str, Any]] = []
+        self._dirty: set[str] = set()
+        self._flush_timer: Optional[threading.Timer] = None
+        # deques com maxlen: o descarte dos mais antigos e O(1), sem recopiar a lista
+        self._short: Deque[Dict[str, Any]] = deque(maxlen=short_limit)
+        self._long_entries: Deque[Dict[str, Any]] = deque(maxlen=self._LONG_LIMIT)
+        # Indice invertido token -> seqs das entradas de longo prazo; a entrada com
+        # seq s fica em self._long_entries[s - self._long_first_seq]
+        self._long_index: Dict[str, set[int]] = defaultdict(set)
+        self._long_first_seq = 0
         self._profile: Dict[str, Any] = {}
         self._visual: Dict[str, Any] = {
             "last_screen": None,
@@ -40,24 +74,26 @@ class MemoryStore:
         }
         self._load()
         self._maybe_migrate_legacy()
+        self._reindex_long()
+        atexit.register(self.flush)
 
     def _load(self) -> None:
-        self._short = self._read_json(self.short_path, default=[])
+        short = self._read_json(self.short_path, default=[])
         long_data = self._read_json(self.long_path, default={"entries": [], "profile": {}})
         if isinstance(long_data, dict):
-            self._long_entries = long_data.get("entries") or []
+            entries = long_data.get("entries") or []
             self._profile = long_data.get("profile") or {}
         else:
-            self._long_entries = []
+            entries = []
             self._profile = {}
         self._visual = self._read_json(
             self.visual_path,
             default={"last_screen": None, "last_image": None, "last_opened_website": None},
         )
-        if not isinstance(self._short, list):
-            self._short = []
-        if not isinstance(self._long_entries, list):
-            self._long_entries = []
+        self._short = deque(short if isinstance(short, list) else [], maxlen=self.short_limit)
+        self._long_entries = deque(
+            entries if isinstance(entries, list) else [], maxlen=self._LONG_LIMIT
+        )
         if not isinstance(self._profile, dict):
             self._profile = {}
         if not isinstance(self._visual, dict):
@@ -138,19 +174,42 @@ class MemoryStore:
 
     def _write_json(self, path: str, data) -> None:
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            write_atomic(path, json_dumps(data))
         except Exception:
             return
 
+    def _mark_dirty(self, store: str) -> None:
+        # Chamado com self._lock (ou no __init__): agenda um unico flush por rajada
+        self._dirty.add(store)
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self._FLUSH_DELAY, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self) -> None:
+        """Grava agora os stores com alteracoes pendentes."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            dirty, self._dirty = self._dirty, set()
+            if "short" in dirty:
+                self._write_json(self.short_path, list(self._short))
+            if "long" in dirty:
+                self._write_json(
+                    self.long_path, {"entries": list(self._long_entries), "profile": self._profile}
+                )
+            if "visual" in dirty:
+                self._write_json(self.visual_path, self._visual)
+
     def _save_short(self) -> None:
-        self._write_json(self.short_path, self._short)
+        self._mark_dirty("short")
 
     def _save_long(self) -> None:
-        self._write_json(self.long_path, {"entries": self._long_entries, "profile": self._profile})
+        self._mark_dirty("long")
 
     def _save_visual(self) -> None:
-        self._write_json(self.visual_path, self._visual)
+        self._mark_dirty("visual")
 
     def start_session(self, *args, **kwargs) -> str:
         return str(uuid.uuid4())
@@ -166,13 +225,11 @@ class MemoryStore:
                     "content": content,
                 }
             )
-            if len(self._short) > self.short_limit:
-                self._short = self._short[-self.short_limit :]
             self._save_short()
 
     def get_recent_messages(self, limit: int = 10) -> List[Dict[str, Any]]:
         with self._lock:
-            return list(self._short[-max(1, limit) :])
+            return self._tail(self._short, limit)
 
     def add_long_term(
         self,
@@ -187,19 +244,20 @@ class MemoryStore:
             return
         tags_text = self._normalize_tags(tags)
         with self._lock:
-            self._long_entries.append(
-                {
-                    "id": str(uuid.uuid4()),
-                    "ts": time.time(),
-                    "kind": kind,
-                    "content": content,
-                    "tags": tags_text,
-                    "source": source,
-                    "context": context,
-                }
-            )
-            if len(self._long_entries) > 5000:
-                self._long_entries = self._long_entries[-5000:]
+            entry = {
+                "id": str(uuid.uuid4()),
+                "ts": time.time(),
+                "kind": kind,
+                "content": content,
+                "tags": tags_text,
+                "source": source,
+                "context": context,
+            }
+            if len(self._long_entries) == self._LONG_LIMIT:
+                self._unindex_long(self._long_entries[0], self._long_first_seq)
+                self._long_first_seq += 1
+            self._long_entries.append(entry)
+            self._index_long(entry, self._long_first_seq + len(self._long_entries) - 1)
             self._save_long()
 
     def search_long_term(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
@@ -220,7 +278,14 @@ class MemoryStore:
         date_range = self._infer_date_range(query)
         hits = []
         with self._lock:
-            for item in reversed(self._long_entries):
+            candidates = candidate_ids(self._long_index, query) if limit > 0 else None
+            if candidates is None:
+                items = reversed(self._long_entries)
+            else:
+                # Mais recentes primeiro, como a varredura linear
+                first = self._long_first_seq
+                items = (self._long_entries[seq - first] for seq in sorted(candidates, reverse=True))
+            for item in items:
                 text = str(item.get("content", "")).lower()
                 tags = str(item.get("tags", "")).lower()
                 if project_tag and project_tag not in tags:
@@ -233,31 +298,35 @@ class MemoryStore:
                     hits.append(item)
                 if len(hits) >= limit:
                     break
-        return list(reversed(hits))
+        hits.reverse()
+        return hits
 
     def get_last_long_term(self, limit: int = 5) -> List[Dict[str, Any]]:
         with self._lock:
-            return list(self._long_entries[-max(1, limit) :])
+            return self._tail(self._long_entries, limit)
 
     # Compatibility profile helpers
+    # _profile e _visual sao copy-on-write: os escritores (com self._lock) montam um
+    # dict novo e religam o atributo, entao os getters leem sem pegar o lock.
     def get_profile(self) -> Dict[str, Any]:
-        with self._lock:
-            return dict(self._profile)
+        return dict(self._profile)
 
     def set_profile_field(self, key: str, value: Any) -> None:
         if not key or value in (None, ""):
             return
         with self._lock:
-            self._profile[key] = value
+            self._profile = {**self._profile, key: value}
             self._save_long()
 
     def update_profile_from_memory_update(self, memory_update: Dict[str, Any]) -> None:
         if not isinstance(memory_update, dict) or not memory_update:
             return
         with self._lock:
+            profile = dict(self._profile)
             for key, value in memory_update.items():
                 if value not in (None, ""):
-                    self._profile[key] = value
+                    profile[key] = value
+            self._profile = profile
             self._save_long()
 
     # Compatibility note helpers (maps to long-term)
@@ -303,10 +372,10 @@ class MemoryStore:
         if not value:
             return
         with self._lock:
-            prefs = self._profile.get("preferences") or []
+            prefs = list(self._profile.get("preferences") or [])
             if value not in prefs:
                 prefs.append(value)
-            self._profile["preferences"] = prefs
+            self._profile = {**self._profile, "preferences": prefs}
             self._save_long()
 
     def format_recent_summaries(self, limit: int = 4) -> str:
@@ -319,57 +388,63 @@ class MemoryStore:
         description = str(description or "").strip()
         if not description:
             return
-        with self._lock:
-            self._visual["last_screen"] = {
+        self._set_visual(
+            "last_screen",
+            {
                 "ts": time.time(),
                 "description": description,
                 "source": source,
-            }
-            self._save_visual()
+            },
+        )
 
     def get_last_screen(self) -> Optional[Dict[str, Any]]:
-        with self._lock:
-            return self._visual.get("last_screen")
+        return self._visual.get("last_screen")
 
     def set_last_image(self, description: str, source: str = "vision") -> None:
         description = str(description or "").strip()
         if not description:
             return
-        with self._lock:
-            self._visual["last_image"] = {
+        self._set_visual(
+            "last_image",
+            {
                 "ts": time.time(),
                 "description": description,
                 "source": source,
-            }
-            self._save_visual()
+            },
+        )
 
     def get_last_image(self) -> Optional[Dict[str, Any]]:
-        with self._lock:
-            return self._visual.get("last_image")
+        return self._visual.get("last_image")
 
     def set_last_opened_website(self, url: str) -> None:
         url = str(url or "").strip()
         if not url:
             return
-        with self._lock:
-            self._visual["last_opened_website"] = {
+        self._set_visual(
+            "last_opened_website",
+            {
                 "ts": time.time(),
                 "url": url,
-            }
-            self._save_visual()
+            },
+        )
 
     def get_last_opened_website(self) -> Optional[Dict[str, Any]]:
+        return self._visual.get("last_opened_website")
+
+    def _set_visual(self, key: str, value: Dict[str, Any]) -> None:
         with self._lock:
-            return self._visual.get("last_opened_website")
+            self._visual = {**self._visual, key: value}
+            self._save_visual()
 
     def clear_short_term(self) -> None:
         with self._lock:
-            self._short = []
+            self._short.clear()
             self._save_short()
 
     def clear_long_term(self) -> None:
         with self._lock:
-            self._long_entries = []
+            self._long_entries.clear()
+            self._reindex_long()
             self._profile = {}
             self._save_long()
 
@@ -379,39 +454,61 @@ class MemoryStore:
             self._save_visual()
 
     def get_stats(self) -> Dict[str, Any]:
-        with self._lock:
-            return {
-                "short_count": len(self._short),
-                "long_count": len(self._long_entries),
-                "has_last_screen": bool(self._visual.get("last_screen")),
-                "has_last_image": bool(self._visual.get("last_image")),
-            }
+        # So len() e leituras do snapshot de _visual: nada a proteger com o lock
+        visual = self._visual
+        return {
+            "short_count": len(self._short),
+            "long_count": len(self._long_entries),
+            "has_last_screen": bool(visual.get("last_screen")),
+            "has_last_image": bool(visual.get("last_image")),
+        }
 
     def _infer_date_range(self, query: str) -> Optional[Tuple[float, float]]:
-        now = datetime.now()
-        q = query.lower()
-        if "hoje" in q:
-            start = datetime(now.year, now.month, now.day)
-            end = start + timedelta(days=1)
-            return start.timestamp(), end.timestamp()
-        if "ontem" in q:
-            start = datetime(now.year, now.month, now.day) - timedelta(days=1)
-            end = start + timedelta(days=1)
-            return start.timestamp(), end.timestamp()
-        if "anteontem" in q or "antes de ontem" in q:
-            start = datetime(now.year, now.month, now.day) - timedelta(days=2)
-            end = start + timedelta(days=1)
-            return start.timestamp(), end.timestamp()
-        if "semana passada" in q:
-            start = datetime(now.year, now.month, now.day) - timedelta(days=7)
-            end = datetime(now.year, now.month, now.day)
-            return start.timestamp(), end.timestamp()
-        if "mes passado" in q or "mês passado" in q:
-            start = datetime(now.year, now.month, 1) - timedelta(days=1)
-            start = datetime(start.year, start.month, 1)
-            end = datetime(now.year, now.month, 1)
-            return start.timestamp(), end.timestamp()
-        return None
+        found = set(self._DATE_RE.findall(query.lower()))
+        if not found:
+            return None
+        today = datetime.combine(date.today(), dtime.min)
+        for phrase in self._DATE_PRIORITY:
+            if phrase in found:
+                start_ago, end_ago = self._DATE_OFFSETS[phrase]
+                start = today - timedelta(days=start_ago)
+                end = today - timedelta(days=end_ago)
+                return start.timestamp(), end.timestamp()
+        # mes passado
+        end = today.replace(day=1)
+        start = (end - timedelta(days=1)).replace(day=1)
+        return start.timestamp(), end.timestamp()
+
+    def _long_tokens(self, item: Dict[str, Any]) -> set[str]:
+        text = str(item.get("content", "")).lower()
+        tags = str(item.get("tags", "")).lower()
+        return set(TOKEN_RE.findall(text)) | set(TOKEN_RE.findall(tags))
+
+    def _index_long(self, item: Dict[str, Any], seq: int) -> None:
+        for token in self._long_tokens(item):
+            self._long_index[token].add(seq)
+
+    def _unindex_long(self, item: Dict[str, Any], seq: int) -> None:
+        for token in self._long_tokens(item):
+            postings = self._long_index.get(token)
+            if postings is not None:
+                postings.discard(seq)
+                if not postings:
+                    del self._long_index[token]
+
+    def _reindex_long(self) -> None:
+        self._long_index = defaultdict(set)
+        self._long_first_seq = 0
+        for seq, item in enumerate(self._long_entries):
+            self._index_long(item, seq)
+
+    @staticmethod
+    def _tail(items: Deque[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+        # Percorre de tras para frente: O(limit), sem pular as N-limit entradas
+        # iniciais (islice a partir do inicio andaria o deque inteiro de 5000)
+        tail = list(islice(reversed(items), max(1, limit)))
+        tail.reverse()
+        return tail
 
     def _in_range(self, ts: Any, date_range: Tuple[float, float]) -> bool:
         try:
@@ -430,10 +527,8 @@ class MemoryStore:
     def _slug(self, value: str | None) -> str:
         if not value:
             return ""
-        text = str(value).strip().lower()
-        text = "".join(ch if ch.isalnum() or ch in {" ", "-", "_"} else " " for ch in text)
-        text = "_".join(text.split())
-        return text
+        text = self._SLUG_RE.sub(" ", str(value).strip().lower())
+        return "_".join(text.split())
 
 
 def get_memory_store() -> MemoryStore:
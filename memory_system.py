@@ -6,7 +6,7 @@ e permite recuperar o histrico completo quando solicitado.
 
 Features:
 - Armazena as ltimas 10 mensagens com resumo
-- Salva histrico completo em JSON
+- Salva histrico completo em JSONL (append por mensagem)
 - Permite recuperar contexto quando solicitado
 - Integrao com o fluxo existente do Crono
 """
@@ -14,15 +14,41 @@ Features:
 import os
 import json
 import datetime
-from typing import List, Dict, Optional, Any
-from dataclasses import dataclass, asdict
+from collections import defaultdict, deque
+from typing import Deque, List, Dict, Iterable, Iterator, Optional, Any
+from dataclasses import dataclass
 from pathlib import Path
 
+from json_io import PRETTY_JSON, json_dumps, write_atomic
+from token_index import TOKEN_RE, candidate_ids
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+
+def _json_loads(raw):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _message_dict(message) -> Dict[str, str]:
+    # Message usa __slots__ (sem __dict__): monta o dict pelos slots, sem a copia recursiva do asdict
+    return {name: getattr(message, name) for name in message.__slots__}
+
+
+def _json_line(message) -> bytes:
+    """Uma linha do JSONL de histrico"""
+    # orjson serializa dataclasses direto; a stdlib passa pelo _message_dict
+    return json_dumps(message, pretty=False, default=_message_dict) + b"\n"
+
+
 # Configuraes
 MEMORY_FILE = "memory_history.json"
 MAX_RECENT_MESSAGES = 10
+SEARCH_CACHE_SIZE = 128
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Message:
     """Representa uma mensagem na memria"""
     id: str
@@ -32,67 +58,181 @@ class Message:
     summary: str
     context: str
 
-@dataclass
+class _HistoryStore:
+    """
+    Historico completo em colunas (uma lista por campo de Message), sem um objeto
+    por mensagem; Message so e montado quando alguem pede a linha.
+    """
+    __slots__ = ('ids', 'timestamps', 'user_texts', 'ai_responses', 'summaries', 'contexts')
+
+    def __init__(self, messages: Iterable[Message] = ()):
+        self.ids: List[str] = []
+        self.timestamps: List[str] = []
+        self.user_texts: List[str] = []
+        self.ai_responses: List[str] = []
+        self.summaries: List[str] = []
+        self.contexts: List[str] = []
+        for msg in messages:
+            self.append(msg)
+
+    def append(self, msg: Message):
+        self.ids.append(msg.id)
+        self.timestamps.append(msg.timestamp)
+        self.user_texts.append(msg.user_text)
+        self.ai_responses.append(msg.ai_response)
+        self.summaries.append(msg.summary)
+        self.contexts.append(msg.context)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, pos: int) -> Message:
+        return Message(
+            self.ids[pos], self.timestamps[pos], self.user_texts[pos],
+            self.ai_responses[pos], self.summaries[pos], self.contexts[pos],
+        )
+
+    def __iter__(self) -> Iterator[Message]:
+        for row in zip(self.ids, self.timestamps, self.user_texts,
+                       self.ai_responses, self.summaries, self.contexts):
+            yield Message(*row)
+
+
+@dataclass(slots=True, frozen=True)
 class MemorySession:
     """Sesso de memria completa"""
-    recent_messages: List[Message]
-    full_history: List[Message]
+    recent_messages: Deque[Message]  # deque(maxlen=MAX_RECENT_MESSAGES)
+    full_history: _HistoryStore
 
 class MemorySystem:
     """Sistema de gerenciamento de memria"""
 
-    def __init__(self, memory_file: str = MEMORY_FILE):
+    def __init__(self, memory_file: str = MEMORY_FILE, debug_pretty: bool = False):
         self.memory_file = memory_file
+        # indent=2 tira o json.dumps do encoder em C; so quando pedido
+        self.debug_pretty = debug_pretty or PRETTY_JSON
+        # Historico completo em JSONL so de append; memory_file guarda so a janela recente
+        self.history_file = os.path.splitext(memory_file)[0] + ".jsonl"
+        self._history_fh = None
+        # Indice de busca alinhado com session.full_history, preenchido sob demanda:
+        # textos em minusculas, token -> posicoes e resultados de consultas recentes
+        self._lowered_history: List[tuple] = []
+        self._lowered_source: Optional[_HistoryStore] = None
+        self._token_index: Dict[str, set] = defaultdict(set)
+        self._search_cache: Dict[str, List[Message]] = {}
         self.session = self._load_memory()
 
     def _load_memory(self) -> MemorySession:
-        """Carrega a memria do arquivo JSON"""
-        if not os.path.exists(self.memory_file):
-            return MemorySession(recent_messages=[], full_history=[])
+        """Carrega a janela recente do JSON e o histrico do JSONL"""
+        recent_messages: List[Message] = []
+        legacy_history = None
+        if os.path.exists(self.memory_file):
+            try:
+                with open(self.memory_file, 'rb') as f:
+                    data = _json_loads(f.read())
+                recent_messages = self._deserialize_messages(data.get('recent_messages', []))
+                legacy_history = data.get('full_history')
+            except Exception as e:
+                print(f" Erro ao carregar memria: {e}")
+
+        if os.path.exists(self.history_file):
+            full_history = self._load_history()
+        elif legacy_history:
+            # Formato antigo (historico dentro do JSON): migra uma vez para o JSONL
+            full_history = _HistoryStore(self._deserialize_messages(legacy_history))
+            self._rewrite_history(full_history)
+            self._write_recent(recent_messages)
+        else:
+            full_history = _HistoryStore()
+        return MemorySession(
+            recent_messages=deque(recent_messages, maxlen=MAX_RECENT_MESSAGES),
+            full_history=full_history
+        )
 
+    def _load_history(self) -> _HistoryStore:
+        """L o JSONL linha a linha direto para as colunas"""
+        history = _HistoryStore()
         try:
-            with open(self.memory_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return MemorySession(
-                    recent_messages=self._deserialize_messages(data.get('recent_messages', [])),
-                    full_history=self._deserialize_messages(data.get('full_history', []))
-                )
+            with open(self.history_file, 'rb') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        row = _json_loads(line)
+                    except Exception:
+                        # Linha truncada (queda no meio de um append): descarta so ela
+                        continue
+                    for msg in self._deserialize_messages((row,)):
+                        history.append(msg)
         except Exception as e:
-            print(f" Erro ao carregar memria: {e}")
-            return MemorySession(recent_messages=[], full_history=[])
+            print(f" Erro ao carregar histrico: {e}")
+        return history
 
-    def _save_memory(self):
-        """Salva a memria no arquivo JSON"""
+    def _append_history(self, message: Message):
+        """Acrescenta uma mensagem ao JSONL (O(1) por mensagem)"""
+        try:
+            if self._history_fh is None:
+                needs_newline = False
+                if os.path.exists(self.history_file) and os.path.getsize(self.history_file) > 0:
+                    # Fecha uma linha truncada deixada por uma queda, para nao colar nela
+                    with open(self.history_file, 'rb') as f:
+                        f.seek(-1, os.SEEK_END)
+                        needs_newline = f.read(1) != b"\n"
+                self._history_fh = open(self.history_file, 'ab')
+                if needs_newline:
+                    self._history_fh.write(b"\n")
+            self._history_fh.write(_json_line(message))
+            self._history_fh.flush()
+        except Exception as e:
+            print(f" Erro ao salvar histrico: {e}")
+
+    def _rewrite_history(self, messages: Iterable[Message]):
+        """Regrava o JSONL inteiro (migracao e limpeza)"""
         try:
-            with open(self.memory_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'recent_messages': [asdict(msg) for msg in self.session.recent_messages],
-                    'full_history': [asdict(msg) for msg in self.session.full_history]
-                }, f, ensure_ascii=False, indent=2)
+            if self._history_fh is not None:
+                self._history_fh.close()
+                self._history_fh = None
+            with open(self.history_file, 'wb') as f:
+                f.write(b''.join(_json_line(msg) for msg in messages))
+        except Exception as e:
+            print(f" Erro ao salvar histrico: {e}")
+
+    def _write_recent(self, recent_messages):
+        try:
+            payload = json_dumps(
+                {'recent_messages': list(recent_messages)},
+                pretty=self.debug_pretty,
+                default=_message_dict,
+            )
+            write_atomic(self.memory_file, payload)
         except Exception as e:
             print(f" Erro ao salvar memria: {e}")
 
+    def _save_memory(self):
+        """Salva a janela recente no arquivo JSON (o histrico vai por append)"""
+        self._write_recent(self.session.recent_messages)
+
     def _deserialize_messages(self, messages: List[Dict[str, Any]]) -> List[Message]:
         """Converte dicionrios para objetos Message"""
         result = []
         for msg in messages:
             try:
+                # Posicional: mesma ordem dos campos de Message
                 result.append(Message(
-                    id=msg['id'],
-                    timestamp=msg['timestamp'],
-                    user_text=msg['user_text'],
-                    ai_response=msg['ai_response'],
-                    summary=msg['summary'],
-                    context=msg['context']
+                    msg['id'], msg['timestamp'], msg['user_text'],
+                    msg['ai_response'], msg['summary'], msg['context'],
                 ))
-            except Exception:
+            except (KeyError, TypeError):
                 continue
         return result
 
     def add_message(self, user_text: str, ai_response: str, summary: str, context: str):
         """Adiciona uma nova mensagem  memria"""
-        timestamp = datetime.datetime.now().isoformat()
-        message_id = str(datetime.datetime.now().timestamp())
+        # Um so now(): id e timestamp saem do mesmo instante
+        now = datetime.datetime.now()
+        timestamp = now.isoformat()
+        message_id = str(now.timestamp())
 
         new_message = Message(
             id=message_id,
@@ -104,23 +244,22 @@ class MemorySystem:
         )
 
         # Adicionar s mensagens recentes (mximo 10)
-        self.session.recent_messages.append(new_message)
-        if len(self.session.recent_messages) > MAX_RECENT_MESSAGES:
-            self.session.recent_messages.pop(0)
+        self.session.recent_messages.append(new_message)  # maxlen descarta a mais antiga
 
-        # Adicionar ao histrico completo
+        # Adicionar ao histrico completo (append no JSONL, sem regravar tudo)
         self.session.full_history.append(new_message)
+        self._append_history(new_message)
 
         # Salvar memria
         self._save_memory()
 
     def get_recent_messages(self) -> List[Message]:
         """Retorna as ltimas mensagens"""
-        return self.session.recent_messages
+        return list(self.session.recent_messages)
 
-    def get_full_history(self) -> List[Message]:
-        """Retorna o histrico completo"""
-        return self.session.full_history
+    def get_full_history(self) -> Iterator[Message]:
+        """Retorna o histrico completo (as Message sao montadas conforme a iteracao)"""
+        return iter(self.session.full_history)
 
     def get_context_summary(self) -> str:
         """Gera um resumo do contexto atual"""
@@ -132,17 +271,54 @@ class MemorySystem:
 
     def clear_memory(self):
         """Limpa toda a memria"""
-        self.session = MemorySession(recent_messages=[], full_history=[])
+        self.session = MemorySession(recent_messages=deque(maxlen=MAX_RECENT_MESSAGES), full_history=_HistoryStore())
+        self._rewrite_history(())
         self._save_memory()
 
+    def _sync_search_index(self):
+        """Indexa as mensagens novas do histrico (ele so cresce por append)"""
+        history = self.session.full_history
+        if self._lowered_source is not history:
+            # Sessao nova (load/clear): recomeca o indice
+            self._lowered_history = []
+            self._token_index = defaultdict(set)
+            self._search_cache.clear()
+            self._lowered_source = history
+        lowered = self._lowered_history
+        if len(lowered) == len(history):
+            return
+        self._search_cache.clear()
+        start = len(lowered)
+        new_rows = zip(history.user_texts[start:], history.ai_responses[start:])
+        for pos, (user_text, ai_response) in enumerate(new_rows, start):
+            user_lower, ai_lower = user_text.lower(), ai_response.lower()
+            lowered.append((user_lower, ai_lower))
+            for token in TOKEN_RE.findall(user_lower) + TOKEN_RE.findall(ai_lower):
+                self._token_index[token].add(pos)
+
     def search_history(self, query: str) -> List[Message]:
         """Busca no histrico por uma query"""
         query_lower = query.lower()
-        return [
-            msg for msg in self.session.full_history
-            if query_lower in msg.user_text.lower() or query_lower in msg.ai_response.lower()
+        self._sync_search_index()
+        cached = self._search_cache.get(query_lower)
+        if cached is not None:
+            return list(cached)
+
+        history = self.session.full_history
+        lowered = self._lowered_history
+        candidates = candidate_ids(self._token_index, query_lower)
+        positions = range(len(history)) if candidates is None else sorted(candidates)
+        result = [
+            history[pos] for pos in positions
+            if query_lower in lowered[pos][0] or query_lower in lowered[pos][1]
         ]
 
+        if len(self._search_cache) >= SEARCH_CACHE_SIZE:
+            # Descarta a consulta mais antiga
+            del self._search_cache[next(iter(self._search_cache))]
+        self._search_cache[query_lower] = result
+        return list(result)
+
 # Funo de convenincia para uso no sts_orchestrator
 def get_memory_system() -> MemorySystem:
     """Retorna uma instncia do MemorySystem"""
@@ -3,13 +3,41 @@ Monitor Manager - Gerenciamento de Multiplos Monitores
 ======================================================
 Detecta monitores conectados e move janelas para o segundo monitor quando disponivel.
 """
+from __future__ import annotations
 
 import os
-import tkinter as tk
-from typing import Optional, Tuple, List
+import threading
+from typing import TYPE_CHECKING, Optional, Tuple, List
 import ctypes
 from ctypes import wintypes
 
+if TYPE_CHECKING:
+    import tkinter as tk
+
+# Indices do GetSystemMetrics
+_SM_CXSCREEN = 0
+_SM_CYSCREEN = 1
+_SM_XVIRTUALSCREEN = 76
+_SM_CXVIRTUALSCREEN = 78
+_SM_CMONITORS = 80
+
+
+class _MONITORINFO(ctypes.Structure):
+    _fields_ = [
+        ("cbSize", wintypes.DWORD),
+        ("rcMonitor", wintypes.RECT),
+        ("rcWork", wintypes.RECT),
+        ("dwFlags", wintypes.DWORD),
+    ]
+
+
+# Tipo do callback do EnumDisplayMonitors (WINFUNCTYPE so existe no Windows)
+_MONITORENUMPROC = (
+    ctypes.WINFUNCTYPE(ctypes.c_int, wintypes.HMONITOR, wintypes.HDC, ctypes.POINTER(wintypes.RECT), wintypes.LPARAM)
+    if hasattr(ctypes, "WINFUNCTYPE")
+    else None
+)
+
 
 class MonitorInfo:
     """Informacoes sobre um monitor"""
@@ -42,35 +70,36 @@ class MonitorManager:
         self.monitors: List[MonitorInfo] = []
         self._detect_monitors()
 
+    def refresh(self):
+        """Refaz a deteccao (ex.: monitor conectado/desconectado)"""
+        self.monitors = []
+        self._detect_monitors()
+
     def _detect_monitors(self):
         """Detecta todos os monitores conectados"""
         try:
             if self._detect_monitors_windows():
                 return
-            self._detect_monitors_tkinter()
+            self._detect_monitors_fallback()
         except Exception as e:
             print(f"Aviso: erro ao detectar monitores: {e}")
-            self._detect_monitors_tkinter()
+            self._detect_monitors_fallback()
 
     def _detect_monitors_windows(self) -> bool:
         """Detecta monitores via WinAPI (com primario correto)."""
+        if _MONITORENUMPROC is None:
+            return False
         try:
-            user32 = ctypes.windll.user32
-
-            class MONITORINFO(ctypes.Structure):
-                _fields_ = [
-                    ("cbSize", wintypes.DWORD),
-                    ("rcMonitor", wintypes.RECT),
-                    ("rcWork", wintypes.RECT),
-                    ("dwFlags", wintypes.DWORD),
-                ]
-
+            get_monitor_info = ctypes.windll.user32.GetMonitorInfoW
             monitors: List[MonitorInfo] = []
+            # Uma struct para todos os monitores: GetMonitorInfoW sobrescreve tudo e os
+            # valores sao copiados para o MonitorInfo antes da proxima chamada
+            info = _MONITORINFO()
+            info.cbSize = ctypes.sizeof(_MONITORINFO)
+            info_ref = ctypes.byref(info)
 
             def _callback(hMonitor, hdcMonitor, lprcMonitor, dwData):
-                info = MONITORINFO()
-                info.cbSize = ctypes.sizeof(MONITORINFO)
-                user32.GetMonitorInfoW(hMonitor, ctypes.byref(info))
+                get_monitor_info(hMonitor, info_ref)
                 rect = info.rcMonitor
                 is_primary = bool(info.dwFlags & 1)
                 monitors.append(
@@ -85,8 +114,7 @@ class MonitorManager:
                 )
                 return 1
 
-            MONITORENUMPROC = ctypes.WINFUNCTYPE(ctypes.c_int, wintypes.HMONITOR, wintypes.HDC, ctypes.POINTER(wintypes.RECT), wintypes.LPARAM)
-            user32.EnumDisplayMonitors(0, 0, MONITORENUMPROC(_callback), 0)
+            ctypes.windll.user32.EnumDisplayMonitors(0, 0, _MONITORENUMPROC(_callback), 0)
 
             if monitors:
                 if not any(m.is_primary for m in monitors):
@@ -97,9 +125,34 @@ class MonitorManager:
             return False
         return False
 
+    def _detect_monitors_fallback(self):
+        """Fallback via GetSystemMetrics (sem subir o Tcl/Tk); tkinter so fora do Windows."""
+        try:
+            metrics = ctypes.windll.user32.GetSystemMetrics
+            screen_width = metrics(_SM_CXSCREEN)
+            screen_height = metrics(_SM_CYSCREEN)
+        except Exception:
+            self._detect_monitors_tkinter()
+            return
+        if screen_width <= 0 or screen_height <= 0:
+            self._detect_monitors_tkinter()
+            return
+
+        self.monitors = [MonitorInfo(0, 0, 0, screen_width, screen_height, True)]
+        if metrics(_SM_CMONITORS) > 1:
+            # Mesmo modelo do fallback Tk: segundo monitor ao lado do primario,
+            # no que sobra da area virtual (a esquerda se ela comeca antes de x=0)
+            virtual_x = metrics(_SM_XVIRTUALSCREEN)
+            second_width = metrics(_SM_CXVIRTUALSCREEN) - screen_width
+            if second_width > 0:
+                second_x = virtual_x if virtual_x < 0 else screen_width
+                self.monitors.append(MonitorInfo(1, second_x, 0, second_width, screen_height, False))
+
     def _detect_monitors_tkinter(self):
-        """Detecta monitores usando tkinter (fallback)."""
+        """Detecta monitores usando tkinter (ultimo recurso)."""
         try:
+            import tkinter as tk
+
             root = tk.Tk()
             root.withdraw()
             screen_width = root.winfo_screenwidth()
@@ -226,7 +279,7 @@ def move_cmd_to_monitor(monitor: MonitorInfo):
 
 
 def move_window_to_primary(window: tk.Tk, width: int = 900, height: int = 900) -> bool:
-    manager = MonitorManager()
+    manager = get_monitor_manager()
     primary = manager.get_primary_monitor()
     if not primary:
         return False
@@ -234,7 +287,7 @@ def move_window_to_primary(window: tk.Tk, width: int = 900, height: int = 900) -
 
 
 def move_cmd_to_primary() -> bool:
-    manager = MonitorManager()
+    manager = get_monitor_manager()
     primary = manager.get_primary_monitor()
     if not primary:
         return False
@@ -245,7 +298,7 @@ def setup_secondary_monitor_mode(window: tk.Tk, width: int = 900, height: int =
     if os.getenv("CRONO_DISABLE_MONITOR_SETUP", "").strip().lower() in {"1", "true", "yes", "y"}:
         print("Monitor setup desativado por CRONO_DISABLE_MONITOR_SETUP.")
         return False
-    monitor_manager = MonitorManager()
+    monitor_manager = get_monitor_manager()
     monitor_manager.print_monitor_info()
 
     if monitor_manager.has_multiple_monitors():
@@ -262,5 +315,15 @@ def setup_secondary_monitor_mode(window: tk.Tk, width: int = 900, height: int =
     return False
 
 
+# Deteccao (WinAPI ou uma raiz Tk escondida) roda uma vez; use refresh() para refazer
+_monitor_manager: Optional[MonitorManager] = None
+_monitor_manager_lock = threading.Lock()
+
+
 def get_monitor_manager() -> MonitorManager:
-    return MonitorManager()
+    global _monitor_manager
+    if _monitor_manager is None:
+        with _monitor_manager_lock:
+            if _monitor_manager is None:
+                _monitor_manager = MonitorManager()
+    return _monitor_manager
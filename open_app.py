@@ -1,7 +1,28 @@
 import time
 import os
-import pyautogui
+from functools import lru_cache
 from tts import edge_speak
+from clipboard_paste import paste_text
+
+
+@lru_cache(maxsize=1)
+def _pyautogui():
+    """pyautogui (e o PIL que vem junto) so e carregado quando um app e aberto de fato."""
+    import pyautogui
+
+    pyautogui.PAUSE = 0.1
+    return pyautogui
+
+
+@lru_cache(maxsize=1)
+def _desktop_root() -> str:
+    """Desktop do usuario (o do OneDrive, se existir); resolvido uma vez por processo."""
+    user_home = os.path.expanduser("~")
+    onedrive_root = os.environ.get("OneDrive") or os.path.join(user_home, "OneDrive")
+    desktop_root = os.path.join(onedrive_root, "Desktop")
+    if not os.path.exists(desktop_root):
+        desktop_root = os.path.join(user_home, "Desktop")
+    return desktop_root
 
 
 def open_app(
@@ -47,12 +68,7 @@ def open_app(
                 folder_path = candidate
 
         if not folder_path:
-            user_home = os.path.expanduser("~")
-            onedrive_root = os.environ.get("OneDrive") or os.path.join(user_home, "OneDrive")
-            desktop_root = os.path.join(onedrive_root, "Desktop")
-            if not os.path.exists(desktop_root):
-                desktop_root = os.path.join(user_home, "Desktop")
-            candidate = os.path.join(desktop_root, folder_name)
+            candidate = os.path.join(_desktop_root(), folder_name)
             if os.path.isdir(candidate):
                 folder_path = candidate
 
@@ -75,14 +91,11 @@ def open_app(
         edge_speak(response, player)
 
     try:
-        pyautogui.PAUSE = 0.1
-
-
+        pyautogui = _pyautogui()
         pyautogui.press("win")
         time.sleep(0.3)
 
-        pyautogui.write(app_name, interval=0.03)
-        time.sleep(0.2)
+        paste_text(app_name)  # nome na busca do Windows
 
         pyautogui.press("enter")
         time.sleep(0.6)
@@ -2,6 +2,7 @@
 JARVIS - Simple Voice Assistant
 """
 import os
+import re
 import sys
 import asyncio
 from dotenv import load_dotenv
@@ -18,6 +19,49 @@ from actions.open_website import open_website_action
 
 load_dotenv()
 
+# Palavras-chave por intencao, na ordem de prioridade do process_command
+_INTENT_KEYWORDS = (
+    ("open_app", ("abra", "abre", "abrir", "open")),
+    ("close_app", ("fecha", "feche", "fechar", "close")),
+    ("describe_screen", ("o que você vê", "descreva a tela", "o que tem na tela")),
+    ("weather", ("clima", "tempo", "previsão", "vai chover")),
+    ("type_text", ("digite", "digita", "escreva", "type")),
+    ("create_file", ("cria arquivo", "crie arquivo", "criar arquivo")),
+    ("create_folder", ("cria pasta", "crie pasta", "criar pasta")),
+    ("new_project", ("começa projeto", "novo projeto", "inicia projeto")),
+    ("open_website", ("abra o site", "vai para", "acesse")),
+    ("screen_click", ("clica", "clique", "click", "mova o mouse")),
+    ("press_key", ("pressiona", "aperte", "aperta")),
+)
+_OPEN_KWS = frozenset({"abra", "abre", "abrir", "open"})
+_CLOSE_KWS = frozenset({"fecha", "feche", "fechar", "close"})
+_CITY_PREPOSITIONS = frozenset({"em", "de", "para"})
+_URL_MARKERS = frozenset({"site", "para"})
+_COMMON_APPS = ("chrome", "firefox", "spotify", "vscode", "notepad")
+_TYPE_PHRASES = ("digite", "digita", "escreva", "type")
+_INTENT_PRIORITY = {name: i for i, (name, _) in enumerate(_INTENT_KEYWORDS)}
+# Uma passada so: o lookahead testa todas as posicoes (casamentos sobrepostos) e,
+# em cada posicao, a alternancia ja prefere a intencao de maior prioridade
+_INTENT_RE = re.compile(
+    "(?="
+    + "|".join(
+        f"(?P<{name}>{'|'.join(re.escape(k) for k in keywords)})" for name, keywords in _INTENT_KEYWORDS
+    )
+    + ")"
+)
+
+
+def _detect_intent(text_lower: str):
+    """Intencao de maior prioridade com alguma palavra-chave em text_lower (ou None)"""
+    best = None
+    for match in _INTENT_RE.finditer(text_lower):
+        name = match.lastgroup
+        if best is None or _INTENT_PRIORITY[name] < _INTENT_PRIORITY[best]:
+            best = name
+            if _INTENT_PRIORITY[best] == 0:
+                break
+    return best
+
 
 class CronoOrchestrator:
     """
@@ -27,6 +71,9 @@ class CronoOrchestrator:
     def __init__(self):
         self.running = True
         self.ui = None
+        # Fila alimentada pelo STT; run() dorme em get() em vez de fazer polling
+        self.command_queue: asyncio.Queue[str] = asyncio.Queue()
+        self._loop = None
     
     def log(self, message: str):
         print(f"[ORCHESTRATOR] {message}")
@@ -34,6 +81,19 @@ class CronoOrchestrator:
     def set_ui(self, ui):
         self.ui = ui
     
+    def post_command(self, text: str):
+        """Enfileira um comando para run(); pode ser chamado de outra thread."""
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            loop.call_soon_threadsafe(self.command_queue.put_nowait, text)
+        else:
+            self.command_queue.put_nowait(text)
+    
+    def stop(self):
+        """Encerra run(), acordando o get() pendente."""
+        self.running = False
+        self.post_command("")
+    
     async def process_command(self, text: str):
         """
         Process voice command and execute appropriate action.
@@ -45,13 +105,14 @@ class CronoOrchestrator:
         
         # Simple command parsing (can be enhanced with LLM)
         text_lower = text.lower().strip()
+        intent = _detect_intent(text_lower)
+        words = text_lower.split()
         
         # Check for app opening commands
-        if any(x in text_lower for x in ["abra", "abre", "abrir", "open"]):
+        if intent == "open_app":
             # Try to extract app name
-            words = text_lower.split()
             for i, word in enumerate(words):
-                if word in ["abra", "abre", "abrir", "open"]:
+                if word in _OPEN_KWS:
                     if i + 1 < len(words):
                         app_name = words[i + 1]
                         result = open_app({"app_name": app_name}, player=self.ui)
@@ -63,7 +124,7 @@ class CronoOrchestrator:
                         return
             
             # If no specific app found, try common apps
-            for app in ["chrome", "firefox", "spotify", "vscode", "notepad"]:
+            for app in _COMMON_APPS:
                 if app in text_lower:
                     open_app({"app_name": app}, player=self.ui)
                     return
@@ -72,10 +133,9 @@ class CronoOrchestrator:
                 self.ui.write_log("Desculpe, não entendi qual aplicativo abrir.")
         
         # Check for close app commands
-        elif any(x in text_lower for x in ["fecha", "feche", "fechar", "close"]):
-            words = text_lower.split()
+        elif intent == "close_app":
             for i, word in enumerate(words):
-                if word in ["fecha", "feche", "fechar", "close"]:
+                if word in _CLOSE_KWS:
                     if i + 1 < len(words):
                         app_name = words[i + 1]
                         close_app({"app_name": app_name}, player=self.ui)
@@ -85,16 +145,15 @@ class CronoOrchestrator:
                 self.ui.write_log("Qual aplicativo o senhor gostaria de fechar")
         
         # Check for screen description
-        elif any(x in text_lower for x in ["o que você vê", "descreva a tela", "o que tem na tela"]):
+        elif intent == "describe_screen":
             capture_and_analyze_screen(player=self.ui, session_memory=None, user_question=text)
         
         # Check for weather
-        elif any(x in text_lower for x in ["clima", "tempo", "previsão", "vai chover"]):
+        elif intent == "weather":
             # Extract city if mentioned
             city = None
-            words = text_lower.split()
             for i, word in enumerate(words):
-                if word in ["em", "de", "para"]:
+                if word in _CITY_PREPOSITIONS:
                     if i + 1 < len(words):
                         city = words[i + 1].capitalize()
                         break
@@ -102,30 +161,29 @@ class CronoOrchestrator:
             weather_action({"city": city}, player=self.ui)
         
         # Check for typing
-        elif any(x in text_lower for x in ["digite", "digita", "escreva", "type"]):
+        elif intent == "type_text":
             # Extract text to type
             text_to_type = text_lower
-            for phrase in ["digite", "digita", "escreva", "type"]:
+            for phrase in _TYPE_PHRASES:
                 text_to_type = text_to_type.replace(phrase, "").strip()
             if text_to_type:
                 type_text_action({"text": text_to_type}, player=self.ui)
         
         # Check for file operations
-        elif any(x in text_lower for x in ["cria arquivo", "crie arquivo", "criar arquivo"]):
+        elif intent == "create_file":
             file_operations({"operation": "create_file"}, player=self.ui)
-        elif any(x in text_lower for x in ["cria pasta", "crie pasta", "criar pasta"]):
+        elif intent == "create_folder":
             file_operations({"operation": "create_folder"}, player=self.ui)
         
         # Check for project management
-        elif any(x in text_lower for x in ["começa projeto", "novo projeto", "inicia projeto"]):
+        elif intent == "new_project":
             project_manager({"action": "create"}, player=self.ui)
         
         # Check for website opening
-        elif any(x in text_lower for x in ["abra o site", "vai para", "acesse"]):
+        elif intent == "open_website":
             url = None
-            words = text_lower.split()
             for i, word in enumerate(words):
-                if word in ["site", "para"]:
+                if word in _URL_MARKERS:
                     if i + 1 < len(words):
                         url = words[i + 1]
                         break
@@ -133,11 +191,11 @@ class CronoOrchestrator:
                 open_website_action({"url": url}, player=self.ui)
         
         # Check for screen control
-        elif any(x in text_lower for x in ["clica", "clique", "click", "mova o mouse"]):
+        elif intent == "screen_click":
             screen_controller({"target": "elemento", "action_type": "click"}, player=self.ui)
         
         # Check for key press
-        elif any(x in text_lower for x in ["pressiona", "aperte", "aperta"]):
+        elif intent == "press_key":
             key = "enter"
             if "espaço" in text_lower or "espaco" in text_lower:
                 key = "space"
@@ -152,14 +210,15 @@ class CronoOrchestrator:
     async def run(self):
         """Main orchestration loop"""
         self.ui.write_log("✅ JARVIS Online. Aguardando comandos...")
+        self._loop = asyncio.get_running_loop()
         
         while self.running:
             try:
-                # 1. Get voice input
-                # This would be connected to actual STT
-                pass
-                
-                await asyncio.sleep(0.1)
+                # Sem comando pendente a task fica parada aqui (zero wakeups)
+                text = await self.command_queue.get()
+                if not self.running:
+                    break
+                await self.process_command(text)
                 
             except Exception as e:
                 self.log(f"Error: {e}")
@@ -4,14 +4,15 @@ Plan schema normalization and validation for Crono
 from __future__ import annotations
 
 from dataclasses import dataclass
+from types import MappingProxyType
 from typing import Any, Dict, List, Optional, Tuple
 import uuid
 
 
-RISK_LEVELS = {"safe", "sensitive", "destructive"}
+RISK_LEVELS = frozenset({"safe", "sensitive", "destructive"})
 
 # Intents supported by the orchestrator handlers
-KNOWN_INTENTS = {
+KNOWN_INTENTS = frozenset({
     "open_app",
     "close_app",
     "type_text",
@@ -44,9 +45,9 @@ KNOWN_INTENTS = {
     "graphic_art",
     "load_skills",
     "multi_tool_use.parallel",
-}
+})
 
-RISK_ALIASES = {
+RISK_ALIASES = MappingProxyType({
     "low": "safe",
     "safe": "safe",
     "normal": "sensitive",
@@ -57,10 +58,10 @@ RISK_ALIASES = {
     "dangerous": "destructive",
     "destructive": "destructive",
     "critical": "destructive",
-}
+})
 
 
-@dataclass
+@dataclass(slots=True)
 class PlanStep:
     step_id: str
     intent: str
@@ -70,7 +71,7 @@ class PlanStep:
     summary: str
 
 
-@dataclass
+@dataclass(slots=True)
 class PlanEnvelope:
     plan_id: str
     goal: str
@@ -134,6 +135,31 @@ def normalize_plan(raw: Dict[str, Any]) -> PlanEnvelope:
     )
 
 
+def plan_to_dict(plan: PlanEnvelope) -> Dict[str, Any]:
+    """
+    Convert a PlanEnvelope to the dict shape produced by dataclasses.asdict.
+    Shallow: step parameters are shared instead of deep-copied.
+    """
+    return {
+        "plan_id": plan.plan_id,
+        "goal": plan.goal,
+        "needs_clarification": plan.needs_clarification,
+        "clarifying_question": plan.clarifying_question,
+        "plan": [
+            {
+                "step_id": step.step_id,
+                "intent": step.intent,
+                "parameters": step.parameters,
+                "risk": step.risk,
+                "requires_confirmation": step.requires_confirmation,
+                "summary": step.summary,
+            }
+            for step in plan.plan
+        ],
+        "response": plan.response,
+    }
+
+
 def validate_plan(plan: PlanEnvelope) -> Tuple[bool, Optional[str]]:
     """
     Validate a PlanEnvelope structure and intents.
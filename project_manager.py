@@ -1,6 +1,6 @@
 import os
-import json
 from tts import edge_speak
+from json_io import json_dumps
 
 def project_manager(
     parameters: dict,
@@ -32,10 +32,14 @@ def project_manager(
                 return False
 
             project_path = os.path.join(base_dir, project_name)
+            msg = f"Projeto '{project_name}' inicializado com sucesso, senhor. Criei a estrutura de pastas e o arquivo de contexto."
+            # edge_speak ja roda em thread propria: disparado antes, a sintese (rede)
+            # corre junto com a escrita das pastas/arquivos; numa falha a fala de erro
+            # abaixo interrompe esta
+            edge_speak(response if response else msg, player)
             
-            # Create project structure
-            folders = ["", "src", "docs", "tests", "assets"]
-            for folder in folders:
+            # Create project structure (makedirs das subpastas ja cria project_path)
+            for folder in ("src", "docs", "tests", "assets"):
                 os.makedirs(os.path.join(project_path, folder), exist_ok=True)
             
             # Create/Update context file
@@ -46,8 +50,9 @@ def project_manager(
                 "status": "active",
                 "created_at": str(os.path.getctime(project_path))
             }
-            with open(context_file, "w", encoding="utf-8") as f:
-                json.dump(context_data, f, indent=4, ensure_ascii=False)
+            with open(context_file, "wb") as f:
+                # context.json e lido por humanos: fica indentado
+                f.write(json_dumps(context_data, pretty=True))
             
             # Create an initial README if it doesn't exist
             readme_path = os.path.join(project_path, "README.md")
@@ -57,9 +62,7 @@ def project_manager(
 
             session_memory.set_active_project(project_name, project_path, project_context)
             
-            msg = f"Projeto '{project_name}' inicializado com sucesso, senhor. Criei a estrutura de pastas e o arquivo de contexto."
             if player: player.write_log(f"Crono: {msg}")
-            edge_speak(response if response else msg, player)
             return True
 
         elif action == "exit":
@@ -3,10 +3,50 @@ Deterministic risk policy for Crono plan steps.
 """
 from __future__ import annotations
 
+import re
 from typing import Dict
 
 from core.plan_schema import PlanStep
 
+# Risco fixo por intent; o que nao estiver aqui (ou nos casos especiais) e "sensitive"
+_INTENT_RISK: Dict[str, str] = {
+    "control_screen": "sensitive",
+    "visual_navigate": "sensitive",
+    "press_key": "sensitive",
+    "type_text": "sensitive",
+    "open_app": "safe",
+    "close_app": "safe",
+    "open_website": "safe",
+    "weather_report": "safe",
+    "describe_screen": "safe",
+    "play_media": "safe",
+    "chat": "safe",
+    "set_timer": "safe",
+    "schedule_calendar": "safe",
+    "create_directory": "sensitive",
+    "scan_directory": "safe",
+    "list_directory": "safe",
+    "get_file_info": "safe",
+    "project_manager": "sensitive",
+    "video_analysis": "safe",
+}
+
+_FILE_ACTION_RISK: Dict[str, str] = {
+    "edit_file": "sensitive",
+    "create_file": "sensitive",
+    "create_folder": "sensitive",
+    "read_file": "safe",
+    "list_files": "safe",
+}
+
+_DESTRUCTIVE_MARKERS = (
+    "remove-item", "del ", "erase ", "rd ", "rmdir",
+    "format", "clear-content", "cipher /w", "diskpart",
+    "shutdown", "restart-computer", "stop-computer",
+)
+# Uma varredura so do comando em vez de um "in" por marcador
+_DESTRUCTIVE_RE = re.compile("|".join(map(re.escape, _DESTRUCTIVE_MARKERS)))
+
 
 def assess_risk(step: PlanStep) -> str:
     """
@@ -19,49 +59,15 @@ def assess_risk(step: PlanStep) -> str:
         action = str(params.get("action") or "").lower()
         if action.startswith("delete"):
             return "destructive"
-        if action in {"edit_file"}:
-            return "sensitive"
-        if action in {"create_file", "create_folder"}:
-            return "sensitive"
-        if action in {"read_file", "list_files"}:
-            return "safe"
-        return "sensitive"
-
-    if intent in {"control_screen", "visual_navigate"}:
-        return "sensitive"
-
-    if intent in {"press_key", "type_text"}:
-        return "sensitive"
-
-    if intent in {"open_app", "close_app", "open_website", "weather_report", "describe_screen", "play_media", "chat"}:
-        return "safe"
-
-    if intent in {"set_timer", "schedule_calendar"}:
-        return "safe"
-
-    if intent in {"create_directory", "scan_directory", "list_directory", "get_file_info"}:
-        if intent == "create_directory":
-            return "sensitive"
-        return "safe"
-
-    if intent == "project_manager":
-        return "sensitive"
-
-    if intent == "video_analysis":
-        return "safe"
+        return _FILE_ACTION_RISK.get(action, "sensitive")
 
     if intent == "system_command":
         command = str(params.get("command") or params.get("cmd") or "").lower()
-        destructive_markers = [
-            "remove-item", "del ", "erase ", "rd ", "rmdir",
-            "format", "clear-content", "cipher /w", "diskpart",
-            "shutdown", "restart-computer", "stop-computer"
-        ]
-        if any(marker in command for marker in destructive_markers):
+        if _DESTRUCTIVE_RE.search(command):
             return "destructive"
         return "sensitive"
 
-    return "sensitive"
+    return _INTENT_RISK.get(intent, "sensitive")
 
 
 def requires_confirmation(risk_level: str) -> bool:
@@ -2,8 +2,9 @@ import os
 import base64
 import pyautogui
 from io import BytesIO
+from PIL import Image
 from dotenv import load_dotenv
-from groq import Groq
+from groq_http import get_groq_client
 from tts import edge_speak
 
 load_dotenv()
@@ -11,7 +12,39 @@ load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_VISION_MODEL = os.getenv("GROQ_VISION_MODEL") or "meta-llama/llama-4-maverick-17b-128e-instruct"
 
-groq_client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
+groq_client = get_groq_client(GROQ_API_KEY)
+
+_DATA_URL_PREFIX = b"data:image/jpeg;base64,"
+# Tela "leve" (poucos detalhes) vai como esta; acima do teto reduz para 768px
+_JPEG_QUALITY = 60
+_JPEG_MAX_BYTES = 120 * 1024
+_REDUCED_SIZE = (768, 768)
+_REDUCED_QUALITY = 65
+# BILINEAR: bem mais rapido que o BICUBIC padrao do thumbnail (e vetorizado no pillow-simd)
+_RESAMPLE = getattr(Image, "Resampling", Image).BILINEAR
+
+
+def _encode_jpeg(image, quality: int) -> BytesIO:
+    buffered = BytesIO()
+    image.save(buffered, format="JPEG", quality=quality)
+    return buffered
+
+
+def _jpeg_data_url(image) -> str:
+    """
+    JPEG -> data URL. Screenshot pesado (muito detalhe) e reduzido antes de enviar:
+    menos bytes para subir e menos tokens de imagem no modelo.
+    """
+    if image.mode != "RGB":
+        image = image.convert("RGB")  # JPEG nao tem alfa
+    buffered = _encode_jpeg(image, _JPEG_QUALITY)
+    if buffered.tell() > _JPEG_MAX_BYTES:
+        image.thumbnail(_REDUCED_SIZE, _RESAMPLE)
+        buffered = _encode_jpeg(image, _REDUCED_QUALITY)
+    # b64 direto do buffer do BytesIO e um unico decode, sem copias em str
+    with buffered.getbuffer() as raw:
+        encoded = base64.b64encode(raw)
+    return (_DATA_URL_PREFIX + encoded).decode("ascii")
 
 
 def capture_and_analyze_screen(player=None, session_memory=None, user_question="", speak: bool = True, stream: bool = False, history: list | None = None):
@@ -24,10 +57,8 @@ def capture_and_analyze_screen(player=None, session_memory=None, user_question="
             player.write_log("Crono: Analisando sua tela...")
 
         screenshot = pyautogui.screenshot()
-        screenshot.thumbnail((1024, 1024))
-        buffered = BytesIO()
-        screenshot.save(buffered, format="JPEG", quality=70)
-        base64_image = base64.b64encode(buffered.getvalue()).decode("utf-8")
+        screenshot.thumbnail((1024, 1024), _RESAMPLE)
+        image_url = _jpeg_data_url(screenshot)
 
         prompt = "Analise esta imagem e produza um contexto visual curto e objetivo."
         if user_question:
@@ -44,7 +75,7 @@ def capture_and_analyze_screen(player=None, session_memory=None, user_question="
                         "role": "user",
                         "content": [
                             {"type": "text", "text": prompt},
-                            {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}},
+                            {"type": "image_url", "image_url": {"url": image_url}},
                         ],
                     }
                 ],
@@ -73,5 +104,7 @@ def capture_and_analyze_screen(player=None, session_memory=None, user_question="
         print(f"{error_msg}")
         if player:
             player.write_log("Crono: Tive um erro ao tentar ver sua tela.")
-        edge_speak("Desculpe, tive um erro ao tentar ver sua tela.")
+        if speak:
+            # Com speak=False quem chamou fala o erro (e na ordem dele)
+            edge_speak("Desculpe, tive um erro ao tentar ver sua tela.")
         return None
@@ -1,9 +1,11 @@
 import time
 import pyautogui
 from tts import edge_speak
+from clipboard_paste import paste_text
 
 REQUIRED_PARAMS = ["receiver", "message_text"]
 
+
 def send_message(parameters: dict, response: str | None = None, player=None, session_memory=None) -> bool:
     """
     Envia uma mensagem via aplicativo Windows (WhatsApp, Telegram, etc.)
@@ -56,18 +58,18 @@ def send_message(parameters: dict, response: str | None = None, player=None, ses
 
         pyautogui.press("win")
         time.sleep(0.3)
-        pyautogui.write(platform, interval=0.03)
+        paste_text(platform)
         pyautogui.press("enter")
         time.sleep(0.6)
 
         pyautogui.hotkey("ctrl", "f")
         time.sleep(0.2)
-        pyautogui.write(receiver, interval=0.03)
+        paste_text(receiver)
         time.sleep(0.2)
         pyautogui.press("enter")
         time.sleep(0.2)
 
-        pyautogui.write(message_text, interval=0.03)
+        paste_text(message_text)
         pyautogui.press("enter")
 
         session_memory.clear_current_question()
@@ -1,14 +1,14 @@
 import os
-import io
+import math
 import time
-import wave
+import queue
 import threading
-from collections import deque
 
 import numpy as np
 import sounddevice as sd
 from dotenv import load_dotenv
-from groq import Groq
+from groq_http import get_groq_client
+from wav_io import wav_bytes
 
 load_dotenv()
 
@@ -16,7 +16,7 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_STT_MODEL = os.getenv("GROQ_STT_MODEL") or "whisper-large-v3"
 GROQ_STT_LANGUAGE = os.getenv("GROQ_STT_LANGUAGE") or "pt"
 GROQ_STT_TEMPERATURE = float(os.getenv("GROQ_STT_TEMPERATURE", "0"))
-client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
+client = get_groq_client(GROQ_API_KEY)
 
 # Audio config (env overrides)
 SAMPLE_RATE = int(os.getenv("CRONO_STT_SAMPLE_RATE", "16000"))
@@ -29,15 +29,60 @@ SPEECH_START_TIMEOUT = float(os.getenv("CRONO_STT_START_TIMEOUT", "8"))
 AMBIENT_CALIBRATION_SECONDS = float(os.getenv("CRONO_STT_AMBIENT_SECONDS", "1.0"))
 ADAPTIVE_NOISE_MULTIPLIER = float(os.getenv("CRONO_STT_NOISE_MULT", "2.0"))
 MIN_SPEECH_SECONDS = float(os.getenv("CRONO_STT_MIN_SPEECH_SECONDS", "0.4"))
+# Reaproveita a calibracao do ruido entre gravacoes por ate N segundos (0 = calibra sempre)
+NOISE_CACHE_SECONDS = float(os.getenv("CRONO_STT_NOISE_CACHE_SECONDS", "60"))
+NOISE_EMA_ALPHA = 0.05
+# Chunks de silencio final mantidos no upload (margem para o fim da ultima palavra)
+TRAIL_SILENCE_KEEP_CHUNKS = int(os.getenv("CRONO_STT_TRAIL_KEEP_CHUNKS", "1"))
+# Chunks que o callback pode adiantar antes de reaproveitar um slot (~8 s de audio)
+_RING_SLOTS = max(4, int(8 / CHUNK_DURATION))
 
 stop_listening_flag = threading.Event()
+# Ultimo limiar calibrado; "ema" segue o ruido de fundo nos chunks sem fala
+_noise_state = {"threshold": None, "ema": None, "calibrated": 0.0}
 
 
 def calculate_energy(chunk: np.ndarray) -> float:
-    return float(np.sqrt(np.mean(chunk.astype(np.float32) ** 2)))
+    # RMS via produto escalar (sdot do BLAS): uma copia float32 e nenhum array de
+    # quadrados. int32 estouraria (4000 amostras * 32768^2 > 2^31)
+    samples = chunk.reshape(-1).astype(np.float32)
+    if not samples.size:
+        return 0.0
+    return math.sqrt(float(np.dot(samples, samples)) / samples.size)
 
 
-def _calibrate_noise_floor(stream: sd.InputStream) -> float:
+class _ChunkReader:
+    """
+    O PortAudio entrega cada bloco por callback direto num ring pre-alocado;
+    read() devolve uma view do proximo chunk (mesma interface do stream.read),
+    sem alocar um array novo por chunk.
+    """
+
+    def __init__(self):
+        self._ring = np.empty((_RING_SLOTS, CHUNK_SIZE), dtype=np.int16)
+        # Bytes crus do ring: o callback do RawInputStream copia o buffer do
+        # PortAudio sem montar um ndarray por bloco
+        self._ring_bytes = memoryview(self._ring).cast("B")
+        self._ready = queue.SimpleQueue()
+        self._slot = 0
+
+    def callback(self, indata, frames, time_info, status):
+        slot = self._slot
+        nbytes = len(indata)
+        if nbytes > CHUNK_SIZE * 2:
+            indata, nbytes = indata[:CHUNK_SIZE * 2], CHUNK_SIZE * 2
+        offset = slot * CHUNK_SIZE * 2
+        self._ring_bytes[offset:offset + nbytes] = indata
+        self._ready.put((slot, nbytes // 2))
+        self._slot = (slot + 1) % _RING_SLOTS
+
+    def read(self, frames: int = CHUNK_SIZE):
+        # Sem bloco em 1 s o dispositivo parou: queue.Empty cai no except do record_voice
+        slot, count = self._ready.get(timeout=1.0)
+        return self._ring[slot, :count], False
+
+
+def _calibrate_noise_floor(stream: _ChunkReader) -> float:
     """Estimate ambient noise to build a dynamic threshold."""
     if AMBIENT_CALIBRATION_SECONDS <= 0:
         return float(SILENCE_THRESHOLD)
@@ -51,7 +96,17 @@ def _calibrate_noise_floor(stream: sd.InputStream) -> float:
     if not energies:
         return float(SILENCE_THRESHOLD)
     baseline = float(np.median(energies))
-    return max(float(SILENCE_THRESHOLD), baseline * ADAPTIVE_NOISE_MULTIPLIER)
+    threshold = max(float(SILENCE_THRESHOLD), baseline * ADAPTIVE_NOISE_MULTIPLIER)
+    _noise_state.update(threshold=threshold, ema=baseline, calibrated=time.time())
+    return threshold
+
+
+def _noise_threshold(stream: _ChunkReader) -> float:
+    """Limiar em cache enquanto recente; senao recalibra (~AMBIENT_CALIBRATION_SECONDS de audio)."""
+    threshold = _noise_state["threshold"]
+    if threshold is not None and (time.time() - _noise_state["calibrated"]) < NOISE_CACHE_SECONDS:
+        return threshold
+    return _calibrate_noise_floor(stream)
 
 
 def stop_listening():
@@ -70,24 +125,30 @@ def record_voice(prompt=None) -> str:
     if not client:
         return ""
 
-    audio_buffer = deque()
+    # Buffer unico do tamanho maximo da gravacao: os chunks sao copiados por indice
+    audio_buffer = np.empty(int(MAX_RECORD_SECONDS * SAMPLE_RATE) + CHUNK_SIZE, dtype=np.int16)
+    write_idx = 0
+    chunk_count = 0
     silence_counter = 0
     recording = False
     record_start = None
 
+    stream = _ChunkReader()
     try:
-        with sd.InputStream(
+        with sd.RawInputStream(
             samplerate=SAMPLE_RATE,
             channels=1,
-            dtype=np.int16,
+            dtype="int16",
             blocksize=CHUNK_SIZE,
-        ) as stream:
-            threshold = _calibrate_noise_floor(stream)
+            callback=stream.callback,
+        ):
+            threshold = _noise_threshold(stream)
             start_time = time.time()
+            ema = _noise_state["ema"]
 
             while not stop_listening_flag.is_set():
                 if not recording and (time.time() - start_time) > SPEECH_START_TIMEOUT:
-                    return ""
+                    break  # sem fala: cai no "if not recording" abaixo
 
                 chunk, _ = stream.read(CHUNK_SIZE)
                 energy = calculate_energy(chunk)
@@ -95,11 +156,20 @@ def record_voice(prompt=None) -> str:
                 if not recording and energy > threshold:
                     recording = True
                     record_start = time.time()
-                    audio_buffer.clear()
+                    write_idx = 0
+                    chunk_count = 0
                     silence_counter = 0
 
+                if not recording and ema is not None:
+                    ema = (1 - NOISE_EMA_ALPHA) * ema + NOISE_EMA_ALPHA * energy
+
                 if recording:
-                    audio_buffer.append(chunk)
+                    samples = chunk.reshape(-1)
+                    if write_idx + samples.size > audio_buffer.size:
+                        break
+                    audio_buffer[write_idx:write_idx + samples.size] = samples
+                    write_idx += samples.size
+                    chunk_count += 1
 
                     if energy < threshold:
                         silence_counter += 1
@@ -111,26 +181,29 @@ def record_voice(prompt=None) -> str:
                     if record_start and (time.time() - record_start) >= MAX_RECORD_SECONDS:
                         break
 
+            if ema is not None and _noise_state["threshold"] is not None:
+                # Acompanha a deriva do ruido sem precisar recalibrar na proxima
+                _noise_state.update(
+                    threshold=max(float(SILENCE_THRESHOLD), ema * ADAPTIVE_NOISE_MULTIPLIER),
+                    ema=ema,
+                )
+
         if not recording:
             return ""
 
         if record_start and (time.time() - record_start) < MIN_SPEECH_SECONDS:
             return ""
 
-        if len(audio_buffer) < 2:
+        if chunk_count < 2:
             return ""
 
-        full_audio = np.concatenate(list(audio_buffer))
-        wav_buffer = io.BytesIO()
-        with wave.open(wav_buffer, "wb") as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(2)
-            wf.setframerate(SAMPLE_RATE)
-            wf.writeframes(full_audio.tobytes())
-        wav_buffer.seek(0)
+        # O silencio final ja e conhecido pelo contador: nao vai para o Whisper
+        trim_chunks = max(0, silence_counter - TRAIL_SILENCE_KEEP_CHUNKS)
+        end_idx = max(CHUNK_SIZE, write_idx - trim_chunks * CHUNK_SIZE)
+        payload = wav_bytes(audio_buffer[:end_idx], SAMPLE_RATE)
 
         transcription = client.audio.transcriptions.create(
-            file=("audio.wav", wav_buffer.read()),
+            file=("audio.wav", payload),
             model=GROQ_STT_MODEL,
             language=GROQ_STT_LANGUAGE,
             temperature=GROQ_STT_TEMPERATURE,
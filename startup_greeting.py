@@ -1,8 +1,37 @@
+import os
 import json
+import time
 import datetime
+import threading
 import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
 from zoneinfo import ZoneInfo
 
+from json_io import json_dumps, write_atomic
+
+# Clima ja consultado vale por 30 min: reinicios seguidos nao esperam a rede
+_WEATHER_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "crono", "weather.json")
+_WEATHER_CACHE_TTL = 1800
+# Mesmo teto do timeout do urlopen: a consulta so comeca antes, nao espera mais
+_WEATHER_WAIT_SECONDS = 5
+
+_weather_future: Future | None = None
+_weather_future_lock = threading.Lock()
+
+
+def prefetch_weather() -> Future:
+    """
+    Dispara a consulta do clima em segundo plano (idempotente). Chamado no
+    prewarm do main.py, a rede corre junto com os imports/init do orquestrador.
+    """
+    global _weather_future
+    with _weather_future_lock:
+        if _weather_future is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="weather")
+            _weather_future = executor.submit(_fetch_sp_weather)
+            executor.shutdown(wait=False)
+        return _weather_future
+
 
 def build_startup_greeting() -> str:
     """
@@ -14,7 +43,10 @@ def build_startup_greeting() -> str:
     time_text = _format_time_12h(now)
     period = _period_label(now.hour)
 
-    weather = _fetch_sp_weather()
+    try:
+        weather = prefetch_weather().result(timeout=_WEATHER_WAIT_SECONDS)
+    except Exception:
+        weather = None
     if weather:
         temp = weather.get("temp_c")
         desc = weather.get("desc")
@@ -81,6 +113,35 @@ def _period_label(hour: int) -> str:
 
 
 def _fetch_sp_weather() -> dict | None:
+    cached = _read_weather_cache()
+    if cached is not None:
+        return cached
+    weather = _download_sp_weather()
+    if weather:
+        _write_weather_cache(weather)
+    return weather
+
+
+def _read_weather_cache() -> dict | None:
+    try:
+        if time.time() - os.path.getmtime(_WEATHER_CACHE_FILE) >= _WEATHER_CACHE_TTL:
+            return None
+        with open(_WEATHER_CACHE_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else None
+    except Exception:
+        return None
+
+
+def _write_weather_cache(weather: dict) -> None:
+    try:
+        os.makedirs(os.path.dirname(_WEATHER_CACHE_FILE), exist_ok=True)
+        write_atomic(_WEATHER_CACHE_FILE, json_dumps(weather, pretty=False))
+    except Exception:
+        pass
+
+
+def _download_sp_weather() -> dict | None:
     url = (
         "https://api.open-meteo.com/v1/forecast"
         "?latitude=-23.55&longitude=-46.63"
@@ -132,35 +193,42 @@ def _round_int(value):
         return None
 
 
+_UNKNOWN_WEATHER = "condicoes indefinidas"
+_WEATHER_CODES = {
+    0: "ceu limpo",
+    1: "principalmente limpo",
+    2: "parcialmente nublado",
+    3: "nublado",
+    45: "nevoeiro",
+    48: "nevoeiro",
+    51: "garoa leve",
+    53: "garoa",
+    55: "garoa forte",
+    56: "garoa gelada leve",
+    57: "garoa gelada forte",
+    61: "chuva fraca",
+    63: "chuva",
+    65: "chuva forte",
+    66: "chuva congelante leve",
+    67: "chuva congelante forte",
+    71: "neve fraca",
+    73: "neve",
+    75: "neve forte",
+    77: "grao de neve",
+    80: "pancadas fracas",
+    81: "pancadas",
+    82: "pancadas fortes",
+    85: "neve fraca",
+    86: "neve forte",
+    95: "trovoadas",
+    96: "trovoadas com granizo",
+    99: "trovoadas com granizo forte",
+}
+# Codigos WMO (0-99) indexados direto numa lista montada uma vez no import
+_WEATHER_DESC = [_WEATHER_CODES.get(code, _UNKNOWN_WEATHER) for code in range(100)]
+
+
 def _weather_desc(code) -> str:
-    mapping = {
-        0: "ceu limpo",
-        1: "principalmente limpo",
-        2: "parcialmente nublado",
-        3: "nublado",
-        45: "nevoeiro",
-        48: "nevoeiro",
-        51: "garoa leve",
-        53: "garoa",
-        55: "garoa forte",
-        56: "garoa gelada leve",
-        57: "garoa gelada forte",
-        61: "chuva fraca",
-        63: "chuva",
-        65: "chuva forte",
-        66: "chuva congelante leve",
-        67: "chuva congelante forte",
-        71: "neve fraca",
-        73: "neve",
-        75: "neve forte",
-        77: "grao de neve",
-        80: "pancadas fracas",
-        81: "pancadas",
-        82: "pancadas fortes",
-        85: "neve fraca",
-        86: "neve forte",
-        95: "trovoadas",
-        96: "trovoadas com granizo",
-        99: "trovoadas com granizo forte",
-    }
-    return mapping.get(code, "condicoes indefinidas")
+    if isinstance(code, int) and 0 <= code < 100:
+        return _WEATHER_DESC[code]
+    return _UNKNOWN_WEATHER
@@ -12,15 +12,30 @@ import io
 import time
 import asyncio
 import threading
+import subprocess
+import concurrent.futures
+from functools import lru_cache
 import sounddevice as sd
 import soundfile as sf
 import edge_tts
 from typing import Optional, Callable
 
+try:
+    import imageio_ffmpeg
+except Exception:
+    imageio_ffmpeg = None
+
+# Edge TTS entrega MP3 24 kHz mono; o ffmpeg devolve PCM int16 em blocos de 100 ms
+_TTS_SAMPLE_RATE = 24000
+_PCM_BLOCK_BYTES = _TTS_SAMPLE_RATE // 10 * 2
+# Depois de um stop, quanto a fala em curso tem para encerrar antes de ser cancelada
+_STOP_GRACE_SECONDS = 1.0
+
 # --- Global State ---
 _stop_event = threading.Event()
 _playback_lock = threading.Lock()
 _current_stream: Optional[sd.OutputStream] = None
+_current_decoder: Optional[subprocess.Popen] = None
 _is_playing = False
 
 # Callbacks
@@ -40,6 +55,19 @@ def stop_speaking():
     global _is_playing
     _stop_event.set()
     _is_playing = False
+    stream = _current_stream
+    if stream is not None:
+        try:
+            stream.abort()
+        except Exception:
+            pass
+    decoder = _current_decoder
+    if decoder is not None:
+        # Mata o ffmpeg: o write pendente no stdin falha e o leitor recebe EOF
+        try:
+            decoder.kill()
+        except Exception:
+            pass
     sd.stop()
 
 
@@ -83,18 +111,34 @@ def streaming_speak(text: str, ui=None, blocking: bool = False):
                 audio_chunks = []
                 
                 async def stream_audio():
+                    # Cada chunk de MP3 vai direto para o decoder e ja toca; sem ffmpeg,
+                    # acumula tudo e toca no fim (_start_playback)
+                    global _current_decoder
+                    decoder = _open_decoder()
+                    player = None
+                    if decoder is not None:
+                        _current_decoder = decoder
+                        player = threading.Thread(target=_play_pcm, args=(decoder,), daemon=True)
+                        player.start()
                     try:
                         async for chunk in communicate.stream():
                             if _stop_event.is_set():
                                 return
                             if chunk["type"] == "audio":
-                                audio_chunks.append(chunk["data"])
+                                if decoder is not None:
+                                    # Fora do loop: com o pipe cheio o write bloqueia
+                                    if not await asyncio.to_thread(_feed_decoder, decoder, chunk["data"]):
+                                        return
+                                else:
+                                    audio_chunks.append(chunk["data"])
                     finally:
                         close_fn = getattr(communicate, "close", None)
                         if callable(close_fn):
                             result = close_fn()
                             if asyncio.iscoroutine(result):
                                 await result
+                        if decoder is not None:
+                            await asyncio.to_thread(_finish_decoder, decoder, player)
 
                     if audio_chunks and not _stop_event.is_set():
                         _start_playback(audio_chunks, threaded=False)
@@ -119,6 +163,83 @@ def streaming_speak(text: str, ui=None, blocking: bool = False):
         finished_event.wait()
 
 
+@lru_cache(maxsize=1)
+def _ffmpeg_exe() -> Optional[str]:
+    if imageio_ffmpeg is None:
+        return None
+    try:
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return None
+
+
+def _open_decoder() -> Optional[subprocess.Popen]:
+    """ffmpeg lendo MP3 no stdin e soltando PCM int16 mono no stdout (None se indisponivel)."""
+    exe = _ffmpeg_exe()
+    if not exe:
+        return None
+    try:
+        return subprocess.Popen(
+            [
+                exe, "-hide_banner", "-loglevel", "error",
+                "-f", "mp3", "-i", "pipe:0",
+                "-f", "s16le", "-ac", "1", "-ar", str(_TTS_SAMPLE_RATE), "pipe:1",
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+        )
+    except Exception:
+        return None
+
+
+def _play_pcm(decoder: subprocess.Popen):
+    """Toca o PCM do decoder conforme ele sai (thread propria; o write bloqueante da o ritmo)."""
+    global _current_stream
+    try:
+        with sd.RawOutputStream(samplerate=_TTS_SAMPLE_RATE, channels=1, dtype="int16") as stream:
+            _current_stream = stream
+            try:
+                while not _stop_event.is_set():
+                    block = decoder.stdout.read(_PCM_BLOCK_BYTES)
+                    if not block:
+                        break
+                    stream.write(block)
+            finally:
+                if _current_stream is stream:
+                    _current_stream = None
+    except Exception as e:
+        if not _stop_event.is_set():
+            print(f"Playback Error: {e}")
+
+
+def _feed_decoder(decoder: subprocess.Popen, data: bytes) -> bool:
+    """Manda um chunk de MP3 ao ffmpeg; False se o processo ja morreu (stop_speaking)."""
+    try:
+        decoder.stdin.write(data)
+        decoder.stdin.flush()
+        return True
+    except (BrokenPipeError, OSError, ValueError):
+        return False
+
+
+def _finish_decoder(decoder: subprocess.Popen, player: threading.Thread):
+    """Fecha o stdin (o ffmpeg termina de decodificar) e espera o audio acabar de tocar."""
+    global _current_decoder
+    try:
+        decoder.stdin.close()
+    except Exception:
+        pass
+    if _stop_event.is_set():
+        decoder.kill()
+    player.join()
+    decoder.kill()  # no-op se ja saiu; garante que nao sobra processo
+    decoder.wait()
+    if _current_decoder is decoder:
+        _current_decoder = None
+
+
 def _start_playback(audio_chunks: list, threaded: bool = False):
     """Start playing accumulated audio chunks"""
     if not audio_chunks or _stop_event.is_set():
@@ -163,20 +284,36 @@ def edge_speak(text: str, ui=None, blocking: bool = False):
     streaming_speak(text, ui, blocking)
 
 
+_tts_loop: Optional[asyncio.AbstractEventLoop] = None
+_tts_loop_lock = threading.Lock()
+
+
+def _get_tts_loop() -> asyncio.AbstractEventLoop:
+    """Loop unico do TTS numa thread daemon (criado no primeiro uso e reaproveitado)."""
+    global _tts_loop
+    if _tts_loop is None:
+        with _tts_loop_lock:
+            if _tts_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="tts-loop", daemon=True).start()
+                _tts_loop = loop
+    return _tts_loop
+
+
 def _run_async(coro):
-    try:
-        asyncio.run(coro)
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
+    # Sem asyncio.run por frase: nada de criar/fechar loop e executor a cada fala.
+    # O loop e compartilhado, entao uma fala presa apos stop_speaking e cancelada
+    # para nao travar as proximas
+    future = asyncio.run_coroutine_threadsafe(coro, _get_tts_loop())
+    stopped_at = None
+    while True:
         try:
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(coro)
-            pending = asyncio.all_tasks(loop)
-            for task in pending:
-                task.cancel()
-            if pending:
-                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
-            loop.run_until_complete(loop.shutdown_asyncgens())
-        finally:
-            loop.close()
-            asyncio.set_event_loop(None)
+            return future.result(timeout=0.1)
+        except concurrent.futures.TimeoutError:
+            if not _stop_event.is_set():
+                continue
+            if stopped_at is None:
+                stopped_at = time.monotonic()
+            elif time.monotonic() - stopped_at >= _STOP_GRACE_SECONDS:
+                future.cancel()
+                return None
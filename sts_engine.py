@@ -10,18 +10,26 @@ Enables natural conversation with:
 """
 
 import os
-import io
-import wave
-import time
+import math
 import asyncio
 import threading
 import numpy as np
 import sounddevice as sd
-from collections import deque
 from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Optional
 from dotenv import load_dotenv
-from groq import Groq
+from groq_http import get_groq_client
+from wav_io import wav_bytes
+
+try:
+    from numpy_rms import rms as _rms_simd  # RMS em C/SIMD (opcional)
+except Exception:
+    _rms_simd = None
+
+try:
+    from numba import njit
+except Exception:
+    njit = None
 
 load_dotenv()
 
@@ -37,6 +45,9 @@ MAX_RECORDING_FRAMES = 500  # ~15s max
 # Barge-in (talk-over) tuning for notebook speakers/mic
 BARGE_IN_GUARD_MS = 250  # ignore detection just after TTS starts
 BARGE_IN_COOLDOWN_MS = 350  # ignore mic briefly after TTS stops
+# Mesmas janelas em frames: o loop compara contadores, sem time.time() por frame
+BARGE_IN_GUARD_FRAMES = math.ceil(BARGE_IN_GUARD_MS / FRAME_DURATION_MS)
+BARGE_IN_COOLDOWN_FRAMES = math.ceil(BARGE_IN_COOLDOWN_MS / FRAME_DURATION_MS)
 BARGE_IN_MULTIPLIER = 1.6  # how much louder than TTS baseline user speech must be
 BARGE_IN_DELTA = 200  # additional absolute margin
 TTS_BASELINE_EMA_ALPHA = 0.15  # smoothing for TTS baseline energy
@@ -50,7 +61,24 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_STT_MODEL = os.getenv("GROQ_STT_MODEL") or "whisper-large-v3"
 GROQ_STT_LANGUAGE = os.getenv("GROQ_STT_LANGUAGE") or "pt"
 GROQ_STT_TEMPERATURE = float(os.getenv("GROQ_STT_TEMPERATURE", "0"))
-groq_client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
+groq_client = get_groq_client(GROQ_API_KEY)
+
+_rms_i16 = None
+if njit is not None:
+    try:
+        @njit(cache=True, fastmath=True, boundscheck=False)
+        def _rms_i16_jit(x):
+            # Uma passada sobre o int16, sem copia float32; int64 nao estoura
+            s = np.int64(0)
+            for i in range(x.shape[0]):
+                v = np.int64(x[i])
+                s += v * v
+            return math.sqrt(s / x.shape[0])
+
+        _rms_i16_jit(np.zeros(FRAME_SIZE, dtype=np.int16))  # compila agora, nao no 1o frame
+        _rms_i16 = _rms_i16_jit
+    except Exception:
+        pass
 
 
 class STSEngine:
@@ -72,7 +100,9 @@ class STSEngine:
         self.interrupt_requested = False
 
         # udio buffers
-        self.audio_buffer = deque(maxlen=MAX_RECORDING_FRAMES)
+        # Gravacao numa arena int16 contigua (uma alocacao): frames copiados em sequencia
+        self._capture = np.empty(MAX_RECORDING_FRAMES * FRAME_SIZE, dtype=np.int16)
+        self._capture_len = 0
         self.tts_audio_playing = False
         self._audio_stream = None
 
@@ -96,8 +126,8 @@ class STSEngine:
         self._echo_threshold_boost = 200  # Boost threshold during TTS
         self._tts_energy_ema = 0.0
         self._tts_energy_initialized = False
-        self._tts_started_at = 0.0
-        self._ignore_until = 0.0
+        self._tts_started_frame = None
+        self._ignore_until_frame = 0
         self._noise_floor_ema = 0.0
         self._noise_floor_initialized = False
 
@@ -152,13 +182,13 @@ class STSEngine:
             self.is_speaking = speaking
             self.tts_audio_playing = speaking
             if speaking:
-                self._tts_started_at = time.time()
+                self._tts_started_frame = self._total_frames
                 self._tts_energy_initialized = False
             else:
                 self._tts_energy_initialized = False
                 self._tts_energy_ema = 0.0
                 # Cooldown to avoid immediate echo pickup
-                self._ignore_until = time.time() + (BARGE_IN_COOLDOWN_MS / 1000.0)
+                self._ignore_until_frame = self._total_frames + BARGE_IN_COOLDOWN_FRAMES
 
     def request_interrupt(self):
         """Request to interrupt current TTS playback"""
@@ -172,7 +202,7 @@ class STSEngine:
             self.is_listening = bool(listening)
             if not self.is_listening:
                 self._is_recording = False
-                self.audio_buffer.clear()
+                self._capture_len = 0
                 self._speech_frames = 0
                 self._silence_frames = 0
 
@@ -191,7 +221,10 @@ class STSEngine:
     def _is_barge_in_speech(self, energy: float, base_threshold: float) -> bool:
         """Detect user speech while TTS is playing using dynamic baseline."""
         # Guard window right after TTS starts
-        if self._tts_started_at and (time.time() - self._tts_started_at) < (BARGE_IN_GUARD_MS / 1000.0):
+        if (
+            self._tts_started_frame is not None
+            and (self._total_frames - self._tts_started_frame) < BARGE_IN_GUARD_FRAMES
+        ):
             return False
 
         # Initialize or update baseline during TTS playback
@@ -216,13 +249,20 @@ class STSEngine:
         if len(audio) == 0:
             return 0.0
         try:
-            return np.sqrt(np.mean(audio.astype(np.float32) ** 2))
+            if _rms_i16 is not None and audio.dtype == np.int16:
+                return _rms_i16(audio.reshape(-1))
+            # Uma copia float32 e nenhum array de quadrados (int16 ** 2 estouraria)
+            samples = np.ascontiguousarray(audio.reshape(-1), dtype=np.float32)
+            if _rms_simd is not None:
+                return float(_rms_simd(samples, window_size=samples.size)[0])
+            return math.sqrt(float(np.dot(samples, samples)) / samples.size)
         except Exception as e:
             print(f"AVISO - Erro ao calcular energia: {e}")
             return 0.0
 
     def _audio_loop(self):
         """Main audio processing loop - runs continuously"""
+        devices = None  # uma unica enumeracao do PortAudio por abertura do stream
         try:
             device = os.getenv("CRONO_INPUT_DEVICE")
             device_index = None
@@ -231,11 +271,16 @@ class STSEngine:
                     if str(device).isdigit():
                         device_index = int(device)
                     else:
-                        for idx, info in enumerate(sd.query_devices()):
-                            name = str(info.get("name") or "")
-                            if device.lower() in name.lower() and info.get("max_input_channels", 0) > 0:
-                                device_index = idx
-                                break
+                        devices = sd.query_devices()
+                        needle = device.lower()
+                        device_index = next(
+                            (
+                                idx for idx, info in enumerate(devices)
+                                if needle in str(info.get("name") or "").lower()
+                                and info.get("max_input_channels", 0) > 0
+                            ),
+                            None,
+                        )
                     if device_index is not None:
                         sd.default.device = (device_index, None)
                         print(f"STS usando dispositivo de entrada: {device_index}")
@@ -281,7 +326,9 @@ class STSEngine:
             print(f"ERRO STS - udio Loop: {type(e).__name__}: {e}")
             try:
                 print("Dispositivos de udio disponveis:")
-                for i, info in enumerate(sd.query_devices()):
+                if devices is None:
+                    devices = sd.query_devices()
+                for i, info in enumerate(devices):
                     print(f"  [{i}] {info.get('name')} (in={info.get('max_input_channels')}, out={info.get('max_output_channels')})")
             except Exception:
                 pass
@@ -298,15 +345,15 @@ class STSEngine:
             if not self.is_listening:
                 if self._is_recording:
                     self._is_recording = False
-                    self.audio_buffer.clear()
+                    self._capture_len = 0
                 self._speech_frames = 0
                 self._silence_frames = 0
                 return
             # Ignore mic briefly after TTS stops
-            if self._ignore_until and time.time() < self._ignore_until:
+            if self._total_frames < self._ignore_until_frame:
                 if self._is_recording:
                     self._is_recording = False
-                    self.audio_buffer.clear()
+                    self._capture_len = 0
                 self._speech_frames = 0
                 self._silence_frames = 0
                 return
@@ -332,7 +379,7 @@ class STSEngine:
             if self.is_speaking and not is_speech:
                 if self._is_recording:
                     self._is_recording = False
-                    self.audio_buffer.clear()
+                    self._capture_len = 0
                 self._speech_frames = 0
                 self._silence_frames = 0
                 return
@@ -345,8 +392,8 @@ class STSEngine:
                         # Speech confirmed - start recording
                         self._is_recording = True
                         self._silence_frames = 0
-                        self.audio_buffer.clear()
-                        self.audio_buffer.append(frame)
+                        self._capture_len = 0
+                        self._push_frame(frame)
                         self._detected_speech_count += 1
 
                         # If TTS is playing, request interrupt
@@ -362,7 +409,7 @@ class STSEngine:
                     self._speech_frames = max(0, self._speech_frames - 1)  # Decay
             else:
                 # Recording - collect audio
-                self.audio_buffer.append(frame)
+                self._push_frame(frame)
 
                 if is_speech:
                     self._silence_frames = 0
@@ -374,26 +421,35 @@ class STSEngine:
                         self._finish_recording()
 
                 # Check max recording length
-                if len(self.audio_buffer) >= MAX_RECORDING_FRAMES:
+                if self._capture_len + FRAME_SIZE > self._capture.size:
                     self._finish_recording()
 
+    def _push_frame(self, frame: np.ndarray):
+        """Append a mic frame to the capture arena"""
+        samples = frame.reshape(-1)
+        start = self._capture_len
+        n = min(samples.size, self._capture.size - start)
+        self._capture[start:start + n] = samples[:n]
+        self._capture_len = start + n
+
     def _finish_recording(self):
         """Finish recording and transcribe"""
         self._is_recording = False
         self._speech_frames = 0
         self._silence_frames = 0
 
-        buffer_size = len(self.audio_buffer)
+        buffer_size = self._capture_len // FRAME_SIZE
         if buffer_size > 5:  # At least ~150ms of audio
             try:
-                audio_data = np.concatenate(list(self.audio_buffer))
-                self._executor.submit(self._transcribe_async, audio_data.copy())
+                # Copia porque a arena e reusada na proxima gravacao
+                audio_data = self._capture[:self._capture_len].copy()
+                self._executor.submit(self._transcribe_async, audio_data)
             except Exception as e:
                 print(f"[WARN] Erro ao preparar audio para transcricao: {e}")
         else:
             print(f"[WARN] Buffer muito pequeno ({buffer_size} frames), descartando")
 
-        self.audio_buffer.clear()
+        self._capture_len = 0
 
     def _transcribe_async(self, audio_data: np.ndarray):
         """Transcribe audio asynchronously using Groq Whisper"""
@@ -406,16 +462,10 @@ class STSEngine:
             return
 
         try:
-            wav_buffer = io.BytesIO()
-            with wave.open(wav_buffer, 'wb') as wf:
-                wf.setnchannels(1)
-                wf.setsampwidth(2)
-                wf.setframerate(SAMPLE_RATE)
-                wf.writeframes(audio_data.tobytes())
-            wav_buffer.seek(0)
+            payload = wav_bytes(audio_data, SAMPLE_RATE)
 
             transcription = groq_client.audio.transcriptions.create(
-                file=("audio.wav", wav_buffer.read()),
+                file=("audio.wav", payload),
                 model=GROQ_STT_MODEL,
                 language=GROQ_STT_LANGUAGE,
                 temperature=GROQ_STT_TEMPERATURE,
@@ -558,7 +608,7 @@ def get_engine_stats() -> dict:
         "running": engine.running,
         "is_speaking": engine.is_speaking,
         "is_listening": engine.is_listening,
-        "buffer_size": len(engine.audio_buffer),
+        "buffer_size": engine._capture_len // FRAME_SIZE,
         "total_frames_processed": engine._total_frames,
         "speech_detected_count": engine._detected_speech_count,
         "is_recording": engine._is_recording,
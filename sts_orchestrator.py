@@ -16,6 +16,7 @@ import asyncio
 import threading
 import uuid
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, List, Callable, Any
 from dataclasses import dataclass
 from enum import Enum
@@ -27,7 +28,7 @@ sys.path.append(BASE_DIR)
 
 from sts_engine import STSEngine, get_sts_engine
 from streaming_tts import streaming_speak, stop_speaking, set_callbacks as set_tts_callbacks
-from llm import get_llm_output, detect_intent_by_keywords
+from llm import get_llm_output, get_llm_output_async, detect_intent_by_keywords
 from core.plan_schema import normalize_plan, validate_plan
 from core.risk_policy import assess_risk, requires_confirmation
 from emotion_system import get_proactive_commentator
@@ -70,6 +71,18 @@ try:
 except Exception:
     MemoryStore = None
 
+# Intents de multi_tool_use.parallel que so esperam rede/LLM e podem rodar juntas.
+# Todas falam so via _speak (retido e falado em ordem); weather_report fica de fora
+# porque o weather_action abre o navegador e fala direto pelo tts
+_PARALLEL_SAFE_INTENTS = frozenset({
+    "system_status",
+    "describe_screen",
+    "get_file_info",
+    "search_personal_data",
+})
+# Falas retidas por thread enquanto essas intents rodam em paralelo (ver _speak)
+_speech_capture = threading.local()
+
 
 class CommandType(Enum):
     """Tipos de comandos especiais"""
@@ -673,8 +686,7 @@ class TaskOrchestrator:
         
         try:
             self.orchestrator._log("Pensamento: analisando pedido...")
-            llm_output = await asyncio.to_thread(
-                get_llm_output,
+            llm_output = await get_llm_output_async(
                 user_text=user_text,
                 memory_block=self.orchestrator._build_memory_block(),
                 include_reasoning=False,
@@ -1217,8 +1229,7 @@ class CronoSTSOrchestrator:
             f"Fala do usuario: {user_text}"
         )
         try:
-            out = await asyncio.to_thread(
-                get_llm_output,
+            out = await get_llm_output_async(
                 user_text=prompt,
                 memory_block=self._build_memory_block(),
                 include_reasoning=False,
@@ -1801,8 +1812,7 @@ class CronoSTSOrchestrator:
                 "Seja pessoal e leve (ex: percebi que vocÃª gosta de X)."
             )
             try:
-                llm_output = await asyncio.to_thread(
-                    get_llm_output,
+                llm_output = await get_llm_output_async(
                     user_text=prompt,
                     memory_block=self._build_memory_block(),
                     include_reasoning=False,
@@ -2206,8 +2216,7 @@ class CronoSTSOrchestrator:
         memory_block = self._build_memory_block()
         
         # Get LLM response
-        llm_output = await asyncio.to_thread(
-            get_llm_output,
+        llm_output = await get_llm_output_async(
             user_text=full_request,
             memory_block=memory_block,
             include_reasoning=self.include_reasoning,
@@ -2475,6 +2484,11 @@ class CronoSTSOrchestrator:
 
     def _speak(self, text: str, blocking: bool = False):
         """Speak with STS coordination"""
+        captured = getattr(_speech_capture, "items", None)
+        if captured is not None:
+            # Handler rodando no pool do multi_tool: fala depois, na ordem do pedido
+            captured.append((text, blocking))
+            return
         if text:
             try:
                 self._log(f"IA: {text}")
@@ -2915,12 +2929,39 @@ class CronoSTSOrchestrator:
         if not tool_uses:
             self._speak("Nenhuma ferramenta para executar.")
             return
+        calls = []
         for item in tool_uses:
             name = item.get("recipient_name") or ""
-            arguments = self._normalize_params(item.get("parameters") or {})
             handler = self.action_handlers.get(name)
             if handler:
-                handler(arguments, response, user_text)
+                calls.append((name, handler, self._normalize_params(item.get("parameters") or {})))
+        # Ferramentas so de leitura/rede rodam juntas, com as falas retidas; o
+        # resultado de cada uma e falado aqui na ordem do pedido. As que mexem em
+        # teclado, mouse ou janelas rodam nesta thread, tambem em ordem
+        parallel = [i for i, c in enumerate(calls) if c[0] in _PARALLEL_SAFE_INTENTS]
+        if len(parallel) < 2:
+            parallel = []
+        with ThreadPoolExecutor(max_workers=max(1, len(parallel))) as pool:
+            futures = {
+                i: pool.submit(self._run_capturing_speech, calls[i][1], calls[i][2], response, user_text)
+                for i in parallel
+            }
+            for i, (_, handler, arguments) in enumerate(calls):
+                future = futures.get(i)
+                if future is None:
+                    handler(arguments, response, user_text)
+                    continue
+                for text, blocking in future.result():
+                    self._speak(text, blocking=blocking)
+
+    def _run_capturing_speech(self, handler, arguments, response, user_text):
+        """Roda o handler retendo as falas de _speak; devolve-as em ordem."""
+        _speech_capture.items = captured = []
+        try:
+            handler(arguments, response, user_text)
+        finally:
+            _speech_capture.items = None
+        return captured
     def _normalize_params(self, params):
         """Ensure handler parameters are always a dict."""
         return params if isinstance(params, dict) else {}
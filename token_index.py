@@ -0,0 +1,36 @@
+"""
+Token Index
+===========
+Busca por substring apoiada num indice invertido {token: ids}, compartilhada pelo
+MemoryStore (memoria longa) e pelo MemorySystem (historico).
+"""
+
+import re
+from typing import Mapping, Optional, Set
+
+TOKEN_RE = re.compile(r"\w+")
+# Palavras mais curtas que isso casam boa parte do vocabulario: varrer o indice
+# inteiro sai mais caro que a busca linear, entao elas nao filtram candidatos
+MIN_INDEXED_WORD = 3
+
+
+def candidate_ids(index: Mapping[str, Set[int]], query: str) -> Optional[Set[int]]:
+    """
+    Ids que podem conter `query` (ja em minusculas) como substring. Cada palavra da
+    query cai dentro de uma palavra do texto, entao basta cruzar as postings dos
+    tokens que a contem. None = nenhuma palavra longa o bastante, varrer tudo.
+    """
+    words = {w for w in TOKEN_RE.findall(query) if len(w) >= MIN_INDEXED_WORD}
+    if not words:
+        return None
+    result: Optional[Set[int]] = None
+    # Palavras mais longas primeiro: casam menos tokens e estreitam o conjunto antes
+    for word in sorted(words, key=len, reverse=True):
+        postings: Set[int] = set()
+        for token, ids in index.items():
+            if word in token:
+                postings |= ids
+        result = postings if result is None else result & postings
+        if not result:
+            return set()
+    return result
@@ -196,15 +196,25 @@ def _fuzzy_replace_words(text: str, replacements: list[dict]) -> str:
     if not variants:
         return text
 
+    min_score = 0.88
+    # Um SequenceMatcher por variante: o indice do lado b e montado uma vez
+    # e so a palavra troca (set_seq1). quick_ratio() e limite superior de
+    # ratio(), entao descarta sem perda quem nao passa do corte nem do melhor.
+    matchers = [(v, SequenceMatcher(None, "", v)) for v in variants]
+
     def best_match(word: str):
         best = None
         best_score = 0.0
-        for v in variants:
+        for v, matcher in matchers:
             if len(word) < 4 and len(v) < 4:
                 continue
             if abs(len(word) - len(v)) > 2:
                 continue
-            score = SequenceMatcher(None, word, v).ratio()
+            matcher.set_seq1(word)
+            upper = matcher.quick_ratio()
+            if upper < min_score or upper <= best_score:
+                continue
+            score = matcher.ratio()
             if score > best_score:
                 best_score = score
                 best = v
@@ -216,7 +226,7 @@ def _fuzzy_replace_words(text: str, replacements: list[dict]) -> str:
             tokens[word_positions[idx]] = variant_map[w_norm]
             continue
         v, score = best_match(w_norm)
-        if v and score >= 0.88:
+        if v and score >= min_score:
             tokens[word_positions[idx]] = variant_map[v]
 
     return "".join(tokens)
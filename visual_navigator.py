@@ -6,14 +6,14 @@ from io import BytesIO
 
 import pyautogui
 from dotenv import load_dotenv
-from groq import Groq
+from groq_http import get_groq_client
 
 
 load_dotenv()
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_VISION_MODEL = os.getenv("GROQ_VISION_MODEL") or "meta-llama/llama-4-maverick-17b-128e-instruct"
-_groq_client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
+_groq_client = get_groq_client(GROQ_API_KEY)
 
 
 def _extract_target(parameters: dict, user_text: str) -> str:
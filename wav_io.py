@@ -0,0 +1,21 @@
+"""
+WAV PCM
+=======
+Monta o WAV PCM 16-bit mono enviado ao Whisper (STT e STS) sem wave/BytesIO.
+"""
+
+import struct
+
+import numpy as np
+
+
+def wav_bytes(samples: np.ndarray, sample_rate: int) -> bytes:
+    """Cabecalho de 44 bytes montado a mao + as amostras int16, numa copia so."""
+    data = memoryview(np.ascontiguousarray(samples, dtype=np.int16)).cast("B")
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data.nbytes, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", data.nbytes,
+    )
+    return header + data